@@ -0,0 +1,5 @@
+import os
+import sys
+
+# viewer_core lives at the repo root, one level up from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
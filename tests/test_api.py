@@ -0,0 +1,98 @@
+import http.client
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from viewer_core import api
+from viewer_core.adapters import ADAPTERS, ViewerDataAdapter
+
+DATASET = "api_test"
+NPIS = [1234567890, 1234567891, 1234567892]
+# Seconds to wait for the server to come up.
+START_TIMEOUT = 10
+
+
+@pytest.fixture(scope="module", autouse=True)
+def dataset(tmp_path_factory):
+    """A small v7-style dataset, registered under DATASET for the tests."""
+    csv_path = str(tmp_path_factory.mktemp("api") / "viewer_data.csv")
+    job = "[{'employer': 'Mercy Clinic', 'role': 'Physician', 'source': 'https://example.org'}]"
+    pd.DataFrame({
+        "cleaned.name": ["ANN LEE", "BOB KIM", "CAL ORR"],
+        "cleaned.npi": [str(npi) for npi in NPIS],
+        "cleaned.work_experience": [job, "[]", job],
+        "city": ["Austin", "Boston", "Chicago"],
+        "state": ["TX", "MA", "IL"],
+    }).to_csv(csv_path, index=False)
+    adapter = ViewerDataAdapter(DATASET, "API test", csv_path)
+    ADAPTERS[DATASET] = adapter
+    adapter.build()
+    yield adapter
+    del ADAPTERS[DATASET]
+
+
+@pytest.fixture(scope="module")
+def client(dataset):
+    """GET/POST against the API served on a free local port."""
+    server = api.serve(0, host="127.0.0.1")
+    deadline = time.monotonic() + START_TIMEOUT
+    while not server.started:
+        assert time.monotonic() < deadline, "API server did not start"
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    def request(method, path, body=None, headers=None):
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        conn.request(method, path, body, headers or {})
+        response = conn.getresponse()
+        return response.status, {k.lower(): v for k, v in response.getheaders()}, response.read()
+
+    yield request
+    server.should_exit = True
+
+
+def test_profile_carries_version_etag_and_revalidates(client, dataset):
+    status, headers, body = client("GET", f"/physicians/{NPIS[0]}?dataset={DATASET}")
+    assert status == 200
+    assert json.loads(body)["cleaned.npi"] == NPIS[0]
+    assert headers["etag"] == f'"{DATASET}-{dataset.version()}"'
+    assert headers["cache-control"] == f"public, max-age={api.API_MAX_AGE}"
+
+    status, again, body = client("GET", f"/physicians/{NPIS[0]}?dataset={DATASET}", headers={"If-None-Match": headers["etag"]})
+    assert (status, body, again["etag"]) == (304, b"", headers["etag"])
+    status, _, _ = client("GET", f"/physicians/{NPIS[0]}?dataset={DATASET}", headers={"If-None-Match": '"stale"'})
+    assert status == 200
+
+
+def test_not_found(client):
+    assert client("GET", f"/physicians/1?dataset={DATASET}")[0] == 404
+    assert client("GET", "/physicians/not-a-number")[0] == 404
+    assert client("GET", "/physicians/1?dataset=nope")[0] == 404
+
+
+def test_search(client):
+    status, _, body = client("GET", f"/search?q={NPIS[1]}&dataset={DATASET}")
+    assert status == 200
+    assert [r["npi"] for r in json.loads(body)] == [NPIS[1]]
+
+
+def test_batch_parses_json_csv_and_text(client):
+    wanted = [NPIS[2], NPIS[0]]
+    status, headers, body = client(
+        "POST", f"/physicians/batch?dataset={DATASET}", json.dumps(wanted + [1]), {"Content-Type": "application/json"}
+    )
+    assert status == 200 and headers["content-type"].startswith("application/x-ndjson")
+    # Request order; NPIs the dataset lacks are left out.
+    assert [json.loads(line)["cleaned.npi"] for line in body.splitlines()] == wanted
+
+    csv_body = "name,NPI\n" + "\n".join(f"x,{npi}" for npi in wanted)
+    status, _, body = client("POST", f"/physicians/batch?dataset={DATASET}&format=csv", csv_body)
+    assert status == 200 and len(body.splitlines()) == 1 + len(wanted)
+
+    status, _, body = client("POST", f"/physicians/batch?dataset={DATASET}", f"{NPIS[1]}, oops\n{NPIS[0]}")
+    assert [json.loads(line)["cleaned.npi"] for line in body.splitlines()] == [NPIS[1], NPIS[0]]
+
+    assert client("POST", f"/physicians/batch?dataset={DATASET}&format=xml", "1")[0] == 400
+    assert client("POST", f"/physicians/batch?dataset={DATASET}", '["x"]', {"Content-Type": "application/json"})[0] == 400
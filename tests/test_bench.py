@@ -0,0 +1,16 @@
+from viewer_core.bench import regressions
+
+
+def test_regressions_ignore_sub_millisecond_slowdowns():
+    baseline = {"results": [{"schema": "v7", "rows": 1000, "fetch_ms": 0.2, "render_ms": 4.0, "build_s": 1.0}]}
+    results = [{"schema": "v7", "rows": 1000, "fetch_ms": 0.9, "render_ms": 6.0, "build_s": 1.5}]
+    # fetch_ms is 4.5x slower but by only 0.7 ms.
+    assert regressions(baseline, results, 0.25) == [
+        ("v7", 1000, "render_ms", 4.0, 6.0),
+        ("v7", 1000, "build_s", 1.0, 1.5),
+    ]
+    assert regressions(baseline, results, 0.25, min_ms=0) == [
+        ("v7", 1000, "fetch_ms", 0.2, 0.9),
+        ("v7", 1000, "render_ms", 4.0, 6.0),
+        ("v7", 1000, "build_s", 1.0, 1.5),
+    ]
@@ -0,0 +1,65 @@
+import os
+
+import pandas as pd
+
+from viewer_core.dataset import convert_csv
+from viewer_core.diff import CleaningDiff
+from viewer_core.index import PhysicianIndex
+from viewer_core.store import PhysicianStore, build_store
+
+
+def parquet_store(tmp_path, frame):
+    """A store loaded from a .parquet copy of `frame`, as viewer_core.convert makes."""
+    csv_path = str(tmp_path / "data.csv")
+    frame.to_csv(csv_path, index=False)
+    frame.to_parquet(str(tmp_path / "data.parquet"), index=False)
+    # The Parquet copy is only used when it is newer than the CSV.
+    os.utime(csv_path, (0, 0))
+    return PhysicianStore(build_store(csv_path, list_columns=[]), [])
+
+
+def test_cleaning_diff_on_parquet_store_with_numeric_columns(tmp_path):
+    store = parquet_store(tmp_path, pd.DataFrame({
+        "cleaned.npi": [1, 2, 3],
+        "cleaned.name": ["A", "B", "C"],
+        "raw.years_experience.value": [20.0, None, 7.5],
+        "cleaned.years_experience.value": ["20", "12", "7"],
+        # Entirely empty URL columns come back from Parquet as DOUBLE.
+        "raw.linkedin_url.url": [None, None, None],
+        "cleaned.linkedin_url.url": [float("nan")] * 3,
+    }))
+    assert store.column_type("raw.years_experience.value") == "DOUBLE"
+    assert store.column_type("cleaned.linkedin_url.url") != "VARCHAR"
+
+    index = PhysicianIndex.from_store(store)
+    cleaning = CleaningDiff(CleaningDiff.build_table(store, index))
+    summary = cleaning.summary()
+    assert summary["linkedin_changed"] == 0
+    # 20.0 matches "20"; the blank and 7.5 differ.
+    assert summary["years_experience_changed"] == 2
+    position = index.position_of_npi(2)
+    rows = cleaning.side_by_side(position)
+    assert rows.values.tolist() == [["Years Experience", "", "12"]]
+
+
+def test_cleaning_diff_on_converted_store_with_empty_entry_lists(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    pd.DataFrame({
+        "cleaned.npi": ["1", "2"],
+        "cleaned.name": ["A", "B"],
+        "raw.work_experience": ["[]", "[]"],
+        "cleaned.work_experience": ["[]", "[]"],
+        "raw.residency": ["[{'institution': 'Mercy', 'source': 'https://example.org'}]", "[]"],
+        "cleaned.residency": ["[]", "[]"],
+    }).to_csv(csv_path, index=False)
+    convert_csv(csv_path, list_columns=["cleaned.work_experience", "cleaned.residency"])
+    os.utime(csv_path, (0, 0))
+    store = PhysicianStore(build_store(csv_path), ["cleaned.work_experience", "cleaned.residency"])
+    # Every entry field is typed even when no row has an entry.
+    assert store.column_type("cleaned.work_experience").startswith("STRUCT(employer VARCHAR")
+    assert store.column_type("cleaned.residency").endswith('confidence VARCHAR, "source" VARCHAR[])[]')
+
+    index = PhysicianIndex.from_store(store)
+    summary = CleaningDiff(CleaningDiff.build_table(store, index)).summary()
+    assert summary["employers_dropped"] == 0
+    assert summary["residency_dropped"] == 1
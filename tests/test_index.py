@@ -0,0 +1,26 @@
+import pandas as pd
+
+from viewer_core.index import PhysicianIndex
+from viewer_core.search import SearchIndex
+from viewer_core.store import PhysicianStore, build_store
+
+
+def test_rows_without_npi_are_left_out_of_roster_and_search(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    pd.DataFrame({
+        "cleaned.npi": ["1234567890", "", "1234567891"],
+        "cleaned.name": ["ANN LEE", "NO NPI", "BOB KIM"],
+        "city": ["Austin", "Boston", "Chicago"],
+        "state": ["TX", "MA", "IL"],
+    }).to_csv(csv_path, index=False)
+    store = PhysicianStore(build_store(csv_path, list_columns=[]), [])
+    index = PhysicianIndex.from_store(store)
+
+    assert list(index.names) == ["ANN LEE", "BOB KIM"]
+    assert index.position_of_npi(1234567891) == 1
+    # Every roster entry can be fetched by its NPI.
+    assert [row["cleaned.name"] for row in store.fetch_many([int(n) for n in index.npis])] == ["ANN LEE", "BOB KIM"]
+
+    search = SearchIndex.from_store(store, index)
+    assert search.search("chicago") == [1]
+    assert search.search("boston") == []
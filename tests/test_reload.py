@@ -0,0 +1,89 @@
+import os
+import time
+
+import pandas as pd
+
+from viewer_core.adapters import ViewerDataAdapter
+from viewer_core.index import PhysicianIndex
+from viewer_core.reload import Reloader
+from viewer_core.render import FragmentCache
+
+
+def _write(csv_path, rows, later=0):
+    """Write the CSV, dated `later` seconds from now so it is newer than the store."""
+    pd.DataFrame(rows, columns=["cleaned.name", "cleaned.npi", "cleaned.work_experience", "city", "state"]).to_csv(csv_path, index=False)
+    mtime = time.time() + later
+    os.utime(csv_path, (mtime, mtime))
+
+
+def _rows():
+    job = "[{'employer': 'Mercy Clinic', 'role': 'Physician', 'start': '2015', 'end': 'Present', 'source': 'https://example.org'}]"
+    return [
+        ["ANN LEE", "1234567890", job, "Austin", "TX"],
+        ["BOB KIM", "1234567891", "[]", "Boston", "MA"],
+        ["CAL ORR", "1234567892", "[]", "Chicago", "IL"],
+    ]
+
+
+def _reload(reloader, adapter):
+    reloader.start(adapter)
+    reloader._threads[adapter.key].join()
+
+
+def test_reload_applies_a_row_delta(tmp_path):
+    csv_path = str(tmp_path / "viewer_data.csv")
+    rows = _rows()
+    _write(csv_path, rows)
+    adapter = ViewerDataAdapter("reload_test", "Reload test", csv_path)
+    old_version = adapter.build().version
+
+    fragments = FragmentCache()
+    fragments.put(("reload_test", old_version, 1234567890), "<p>ANN LEE</p>")
+    fragments.put(("reload_test", old_version, 1234567891), "<p>BOB KIM</p>")
+    rows[1][3] = "Denver"
+    del rows[2]
+    rows.append(["DEE FOX", "1234567893", "[]", "Dallas", "TX"])
+    _write(csv_path, rows, later=10)
+    assert adapter.needs_build()
+
+    reloader = Reloader(fragments)
+    _reload(reloader, adapter)
+    assert not reloader.failed("reload_test")
+
+    store = adapter.open()
+    assert store.version != old_version
+    assert sorted(int(n) for n in store.changed_npis()) == [1234567891, 1234567892, 1234567893]
+    assert store.fetch(1234567891)["city"] == "Denver"
+    assert store.fetch(1234567892) is None
+    assert store.fetch(1234567890)["cleaned.work_experience"][0]["employer"] == "Mercy Clinic"
+    assert list(PhysicianIndex.open_shared(store).names) == ["ANN LEE", "BOB KIM", "DEE FOX"]
+    # Only the untouched physician's fragment carries over to the new build.
+    assert fragments.get(("reload_test", store.version, 1234567890)) == "<p>ANN LEE</p>"
+    assert fragments.get(("reload_test", store.version, 1234567891)) is None
+
+
+def test_failed_reload_is_not_retried_until_the_csv_changes(tmp_path, monkeypatch, caplog):
+    csv_path = str(tmp_path / "viewer_data.csv")
+    _write(csv_path, _rows())
+    adapter = ViewerDataAdapter("reload_test", "Reload test", csv_path)
+    adapter.build()
+    _write(csv_path, _rows()[:2], later=10)
+
+    attempts = []
+
+    def broken_build(progress=None):
+        attempts.append(progress)
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(adapter, "build", broken_build)
+    reloader = Reloader(FragmentCache())
+    _reload(reloader, adapter)
+    assert reloader.failed("reload_test")
+    assert "reloading reload_test" in caplog.text
+
+    _reload(reloader, adapter)
+    assert len(attempts) == 1
+
+    _write(csv_path, _rows()[:1], later=20)
+    _reload(reloader, adapter)
+    assert len(attempts) == 2
@@ -0,0 +1,64 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from viewer_core.export import export_stream
+from viewer_core.store import PhysicianStore, build_store
+
+
+def text_list_store(tmp_path, cells):
+    """A store whose cleaned.residency column keeps each cell's list text."""
+    csv_path = str(tmp_path / "data.csv")
+    pd.DataFrame({
+        "cleaned.npi": [str(1000000000 + i) for i in range(len(cells))],
+        "cleaned.name": [f"P{i}" for i in range(len(cells))],
+        "cleaned.residency": cells,
+    }).to_csv(csv_path, index=False)
+    store = PhysicianStore(build_store(csv_path, list_columns=["cleaned.residency"]), ["cleaned.residency"])
+    assert store.column_type("cleaned.residency") == "VARCHAR"
+    return store
+
+
+def test_field_values_stay_aligned_across_unquoted_values(tmp_path):
+    store = text_list_store(tmp_path, [
+        "[{'institution': 'A', 'start_year': 2001, 'end_year': '2005'},"
+        " {'institution': 'B', 'start_year': '2006', 'end_year': None}]",
+        '[{"institution": "Cedars\\u2011Sinai", "start_year": null, "end_year": 2010.0}]',
+        "[{'institution': \"St Mary's\", 'start_year': True, 'end_year': ''}]",
+    ])
+    starts, ends = (store.field_values("cleaned.residency", f) for f in ("start_year", "end_year"))
+    rows = store.query(
+        f"SELECT {store.field_values('cleaned.residency', 'institution')}, list_zip({starts}, {ends}) "
+        f"FROM physicians ORDER BY \"cleaned.npi\""
+    ).fetchall()
+    assert rows == [
+        (["A", "B"], [("2001", "2005"), ("2006", None)]),
+        (["Cedars‑Sinai"], [(None, "2010.0")]),
+        (["St Mary's"], [("True", "")]),
+    ]
+
+
+def test_field_values_of_a_field_the_entries_lack_are_null(tmp_path):
+    csv_path = str(tmp_path / "data.csv")
+    pd.DataFrame({"cleaned.npi": ["1234567890"], "cleaned.name": ["A"]}).to_csv(csv_path, index=False)
+    # An older Parquet copy: entries without confidence, source as a string.
+    pa_table = pa.table({
+        "cleaned.npi": [1234567890],
+        "cleaned.name": ["A"],
+        "cleaned.work_experience": [[{"employer": "Mercy", "source": "https://example.org"}, {"employer": "Lakeside", "source": None}]],
+    })
+    pq.write_table(pa_table, str(tmp_path / "data.parquet"))
+    os.utime(csv_path, (0, 0))
+    store = PhysicianStore(build_store(csv_path), ["cleaned.work_experience"])
+
+    employers, confidences = (store.field_values("cleaned.work_experience", f) for f in ("employer", "confidence"))
+    assert store.query(f"SELECT {employers}, {confidences} FROM physicians").fetchall() == [
+        (["Mercy", "Lakeside"], [None, None]),
+    ]
+    rows = [json.loads(line) for line in b"".join(export_stream(store, np.array([1234567890]), "jsonl")).splitlines()]
+    assert rows[0]["cleaned.work_experience.employer"] == "Mercy; Lakeside"
+    assert rows[0]["cleaned.work_experience.confidence"] is None
@@ -0,0 +1,10 @@
+from viewer_core.adapters import ADAPTERS, DEFAULT_DATASET, DatasetAdapter, ViewerDataAdapter
+from viewer_core.dataset import (
+    LIST_COLUMNS,
+    columnar_path,
+    convert_csv,
+    decode_cached,
+    parse_literal,
+)
+from viewer_core.index import PhysicianIndex
+from viewer_core.store import PhysicianStore, build_store, ensure_store, needs_build, store_path
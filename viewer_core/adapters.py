@@ -0,0 +1,88 @@
+import os
+
+from viewer_core.dataset import LIST_COLUMNS
+from viewer_core.diff import CleaningDiff
+from viewer_core.fulltext import TextIndex
+from viewer_core.index import PhysicianIndex
+from viewer_core.facets import FacetIndex
+from viewer_core.stats import DatasetStats
+from viewer_core.store import PhysicianStore, ensure_store, needs_build, store_path, store_version
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DatasetAdapter:
+    """How one enrichment version is laid out and what the viewer shows for it.
+
+    The base layout is the raw.* / cleaned.* extract used by the root app and
+    v5/v6: every nested entry cites its sources as a list, and the Details row
+    carries emails and insurance.
+    """
+
+    list_columns = LIST_COLUMNS
+    details = ["npi", "doximity", "linkedin", "emails", "insurance"]
+    # Sources as a trailing "- url" bullet (v5/v6) or an inline "Source:" line (v7).
+    inline_sources = False
+
+    def __init__(self, key, label, path):
+        self.key = key
+        self.label = label
+        self.path = os.path.join(ROOT, path)
+
+    @property
+    def title(self):
+        return f"Physician Profile Viewer – {self.label}" if self.label else "Physician Profile Viewer"
+
+    def first_source(self, source):
+        """First citation of an entry, whether `source` is a list or a string."""
+        if isinstance(source, (list, tuple)):
+            return source[0] if source else None
+        return source or None
+
+    def needs_build(self):
+        return needs_build(self.path)
+
+    def has_store(self):
+        return os.path.exists(store_path(self.path))
+
+    def version(self):
+        """Version of the store build currently on disk."""
+        return store_version(store_path(self.path))
+
+    def build(self, progress=None):
+        """Ingest the CSV into the store, then write its on-disk indexes."""
+        ensure_store(self.path, self.list_columns, progress)
+        store = self.open()
+        index = PhysicianIndex.open_shared(store)
+        FacetIndex.open_shared(store, index)
+        TextIndex.open_shared(store, index)
+        CleaningDiff.open_shared(store, index)
+        DatasetStats.open_shared(store)
+        return store
+
+    def open(self):
+        """Open the store build on disk as it is, building one if there is none."""
+        if not self.has_store():
+            return self.build()
+        return PhysicianStore(store_path(self.path), self.list_columns)
+
+
+class ViewerDataAdapter(DatasetAdapter):
+    """v7's flat viewer export: cleaned columns only, one source string per
+    entry, no emails/insurance, plus license/location columns."""
+
+    list_columns = LIST_COLUMNS[:3]
+    details = ["npi", "doximity", "linkedin", "license_state"]
+    inline_sources = True
+
+
+ADAPTERS = {
+    adapter.key: adapter
+    for adapter in [
+        DatasetAdapter("current", "", "enrichment_clean.csv"),
+        DatasetAdapter("v5", "V5", "v5_viewer/enrichment_v5_clean.csv"),
+        DatasetAdapter("v6", "V6", "v6_viewer/enrichment_v6_clean.csv"),
+        ViewerDataAdapter("v7", "V7", "v7_viewer/viewer_data.csv"),
+    ]
+}
+DEFAULT_DATASET = "current"
@@ -0,0 +1,215 @@
+"""Read-only HTTP/JSON API over the viewer's datasets.
+
+    python -m viewer_core.api --port 8502
+
+or set VIEWER_API_PORT and the viewer starts it in its own process, on the
+stores and indexes its sessions already have loaded. Every endpoint takes
+`?dataset=<key>` (default: the viewer's default dataset):
+
+    GET  /datasets                   keys, labels and store versions
+    GET  /physicians/{npi}           one profile
+    GET  /search?q=...&limit=25      ranked name/NPI/location matches
+    POST /physicians/batch?format=   profiles for a list of NPIs (a JSON
+                                     array, a CSV with an NPI column or plain
+                                     text), streamed as jsonl, csv or parquet
+
+Responses carry an ETag naming the dataset's store build and a short
+Cache-Control max-age, so clients and proxies revalidate with If-None-Match
+and get a bodyless 304 until a new build lands. It is a Starlette app served
+by uvicorn, both of which ship with Streamlit; store reads run on the
+threadpool so they never block the event loop.
+"""
+import argparse
+import json
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from viewer_core.adapters import ADAPTERS, DEFAULT_DATASET
+from viewer_core.batch import parse_npis
+from viewer_core.export import EXPORT_FORMATS, export_stream
+from viewer_core.index import PhysicianIndex
+from viewer_core.metrics import METRICS
+from viewer_core.render import FragmentCache
+from viewer_core.search import SearchIndex
+
+# Seconds a response may be reused before it must be revalidated.
+API_MAX_AGE = 60
+# Most NPIs one batch request may ask for.
+API_BATCH_LIMIT = 100_000
+API_SEARCH_LIMIT = 100
+# Encoded profile bodies kept across requests, evicted by size.
+API_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def _jsonable(value):
+    """A decoded row as plain JSON values: records become objects, NaN null."""
+    if isinstance(value, Mapping):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _not_modified(request, etag):
+    """Whether the request's If-None-Match already names `etag`."""
+    tags = request.headers.get("if-none-match")
+    if tags is None:
+        return False
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in tags.split(","))
+
+
+def open_dataset(key):
+    """A dataset's store, roster index and search index, as the viewer loads them."""
+    store = ADAPTERS[key].open()
+    index = PhysicianIndex.open_shared(store)
+    return store, index, SearchIndex.from_store(store, index)
+
+
+class _Loaded:
+    """The latest build of each dataset, opened on first use and reopened
+    when a new build lands."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = {}
+
+    def __call__(self, key, version):
+        with self._lock:
+            version_loaded, data = self._loaded.get(key, (None, None))
+            if version_loaded != version:
+                data = open_dataset(key)
+                self._loaded[key] = (version, data)
+            return data
+
+
+def create_app(load=None):
+    """The API as an ASGI app.
+
+    `load(key, version)` returns (store, index, search) for a dataset build;
+    by default each build is opened once and kept until the next one.
+    """
+    load = load or _Loaded()
+    profiles = FragmentCache(API_CACHE_BYTES)
+
+    def error(status, message):
+        return JSONResponse({"error": message}, status_code=status)
+
+    def dataset(request):
+        """(key, version, etag) for the request's dataset, or an error response."""
+        key = request.query_params.get("dataset", DEFAULT_DATASET)
+        if key not in ADAPTERS:
+            return error(404, f"unknown dataset {key!r}")
+        if not ADAPTERS[key].has_store():
+            return error(503, f"dataset {key!r} is not built yet")
+        version = ADAPTERS[key].version()
+        return key, version, f'"{key}-{version}"'
+
+    def cached(request, etag, body=b"", media_type="application/json", status=200):
+        headers = {"ETag": etag, "Cache-Control": f"public, max-age={API_MAX_AGE}"}
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(body, status_code=status, headers=headers, media_type=media_type)
+
+    async def datasets(request):
+        return JSONResponse([
+            {"key": key, "label": adapter.label or "Current",
+             "version": adapter.version() if adapter.has_store() else None}
+            for key, adapter in ADAPTERS.items()
+        ])
+
+    async def physician(request):
+        found = dataset(request)
+        if isinstance(found, Response):
+            return found
+        key, version, etag = found
+        if _not_modified(request, etag):
+            return cached(request, etag)
+        npi = request.path_params["npi"]
+        body = profiles.get((key, version, npi))
+        if body is None:
+            METRICS.count("api_profile_miss")
+            store, _, _ = await run_in_threadpool(load, key, version)
+            row = await run_in_threadpool(store.fetch, npi)
+            if row is None:
+                return cached(request, etag, json.dumps({"error": f"no physician with NPI {npi}"}).encode(), status=404)
+            body = json.dumps(_jsonable(row)).encode()
+            profiles.put((key, version, npi), body)
+        return cached(request, etag, body)
+
+    async def search(request):
+        found = dataset(request)
+        if isinstance(found, Response):
+            return found
+        key, version, etag = found
+        if _not_modified(request, etag):
+            return cached(request, etag)
+        try:
+            limit = min(max(int(request.query_params.get("limit", 25)), 1), API_SEARCH_LIMIT)
+        except ValueError:
+            return error(400, "limit must be an integer")
+        _, index, searcher = await run_in_threadpool(load, key, version)
+        positions = searcher.search(request.query_params.get("q", ""), limit)
+        results = [{"npi": int(index.npis[p]), "name": index.names[p]} for p in positions]
+        return cached(request, etag, json.dumps(results).encode())
+
+    async def batch(request):
+        found = dataset(request)
+        if isinstance(found, Response):
+            return found
+        key, version, etag = found
+        fmt = request.query_params.get("format", "jsonl")
+        if fmt not in EXPORT_FORMATS:
+            return error(400, f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        data = await request.body()
+        if request.headers.get("content-type", "").startswith("application/json"):
+            try:
+                npis = np.array([int(n) for n in json.loads(data)], dtype=np.int64)
+            except (ValueError, TypeError, OverflowError):
+                return error(400, "body must be a JSON array of NPIs")
+        else:
+            _, npis = parse_npis(data)
+        npis = npis[npis > 0]
+        if len(npis) > API_BATCH_LIMIT:
+            return error(413, f"at most {API_BATCH_LIMIT:,} NPIs per request")
+        store, _, _ = await run_in_threadpool(load, key, version)
+        # Profiles in request order; NPIs the dataset lacks are left out.
+        return StreamingResponse(
+            export_stream(store, npis, fmt),
+            media_type=EXPORT_FORMATS[fmt],
+            headers={"ETag": etag, "Cache-Control": "no-store"},
+        )
+
+    return Starlette(routes=[
+        Route("/datasets", datasets),
+        Route("/physicians/batch", batch, methods=["POST"]),
+        Route("/physicians/{npi:int}", physician),
+        Route("/search", search),
+    ])
+
+
+def serve(port, load=None, host="0.0.0.0"):
+    """Serve `create_app(load)` at http://<host>:<port>/ from a daemon thread."""
+    server = uvicorn.Server(uvicorn.Config(create_app(load), host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="api", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
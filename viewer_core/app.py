@@ -0,0 +1,436 @@
+import logging
+import os
+
+import numpy as np
+import streamlit as st
+
+from viewer_core.adapters import ADAPTERS, DEFAULT_DATASET
+from viewer_core.batch import batch_lookup, parse_npis
+from viewer_core.browse import browse_page
+from viewer_core.diff import CleaningDiff, VersionDiff
+from viewer_core.export import EXPORT_FORMATS, export_stream
+from viewer_core.facets import FacetIndex
+from viewer_core.fulltext import TextIndex
+from viewer_core.index import PhysicianIndex
+from viewer_core.metrics import METRICS
+from viewer_core.reload import Reloader
+from viewer_core.render import PREFETCH_DEPTH, PROFILE_CSS, FragmentCache, Prefetcher
+from viewer_core.search import SearchIndex
+from viewer_core.stats import DatasetStats
+from viewer_core.widgets import (
+    FACET_KEY_PREFIX,
+    MAX_DROPDOWN_OPTIONS,
+    batch_view,
+    browse_table,
+    cleaning_view,
+    compare_view,
+    export_panel,
+    facet_filters,
+    search_picker,
+    stats_dashboard,
+    step,
+    timings_panel,
+)
+
+log = logging.getLogger(__name__)
+
+# How many dataset versions stay loaded at once. The cache is shared by every
+# session in the process, so this bounds the process, not each user.
+MAX_LOADED_DATASETS = 2
+# Set to a port number to serve Prometheus metrics at http://host:<port>/metrics.
+# With several server processes on one host, only the first to bind it does.
+METRICS_PORT_ENV = "VIEWER_METRICS_PORT"
+# Set to a port number to serve the read-only JSON API (viewer_core.api) from
+# each server process, on the datasets its sessions have loaded.
+API_PORT_ENV = "VIEWER_API_PORT"
+
+THEME_CSS = """
+<style>
+    .stApp {
+        background-color: #FAFAFA !important;
+        color: #222222 !important;
+    }
+    .block-container {
+        padding-top: 1.5rem !important;
+        padding-bottom: 2rem !important;
+    }
+    div[data-baseweb="select"] > div {
+        background-color: #FFFFFF !important;
+        color: #222222 !important;
+        border-radius: 6px !important;
+        border: 1px solid #CCCCCC !important;
+    }
+    div[data-baseweb="select"] span {
+        color: #222222 !important;
+    }
+</style>
+"""
+
+FONT_CSS = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+html, body, [class*="st-"] {
+    font-family: 'Inter', sans-serif !important;
+}
+</style>
+"""
+
+BUTTON_CSS = """
+<style>
+div.stButton > button {
+    background-color: #FFFFFF !important;
+    color: #222222 !important;
+    border: 1px solid #CCCCCC !important;
+    border-radius: 6px !important;
+}
+div.stButton > button:hover {
+    background-color: #F0F0F0 !important;
+}
+</style>
+"""
+
+# Widget state that only makes sense for one dataset's roster (plus the
+# FACET_KEY_PREFIX filter widgets).
+PER_DATASET_STATE = [
+    "selected_index",
+    "selected_name",
+    "selected_npi",
+    "selected_version",
+    "search_query",
+    "search_choice",
+    "filtered_choice",
+    "browse_page",
+    "browse_rows",
+    "compare_with",
+    "compare_fields",
+    "compare_rows",
+    "cleaning_changes",
+    "cleaning_rows",
+    "batch_upload",
+    "batch_text",
+    "batch_result",
+]
+
+
+# -------------------------
+# Load Data (lazily, once per dataset, shared across sessions)
+# -------------------------
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_data(key, version):
+    # `version` is the store build on disk; a reload that swaps in a new
+    # build makes this (and the indexes below) load afresh.
+    METRICS.count("load_data_miss")
+    store = ADAPTERS[key].open()
+    # Memory-mapped, so every server process on the host shares one copy.
+    return store, PhysicianIndex.open_shared(store)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_search(key, version):
+    METRICS.count("load_search_miss")
+    store, index = load_data(key, version)
+    return SearchIndex.from_store(store, index)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_facets(key, version):
+    METRICS.count("load_facets_miss")
+    store, index = load_data(key, version)
+    return FacetIndex.open_shared(store, index)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_text(key, version):
+    METRICS.count("load_text_miss")
+    store, index = load_data(key, version)
+    return TextIndex.open_shared(store, index)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_stats(key, version):
+    METRICS.count("load_stats_miss")
+    store, _ = load_data(key, version)
+    return DatasetStats.open_shared(store)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_cleaning(key, version):
+    METRICS.count("load_cleaning_miss")
+    store, index = load_data(key, version)
+    return CleaningDiff.open_shared(store, index)
+
+
+@st.cache_resource(max_entries=MAX_LOADED_DATASETS)
+def load_diff(key, version, other, other_version):
+    # Keyed by both builds, like the diff file itself.
+    METRICS.count("load_diff_miss")
+    store, _ = load_data(key, version)
+    other_store, _ = load_data(other, other_version)
+    return VersionDiff.open_shared(store, other_store, other)
+
+
+@st.cache_resource
+def start_metrics_server():
+    # Prometheus scrape endpoint, one per server process, when a port is set.
+    port = os.environ.get(METRICS_PORT_ENV)
+    if not port:
+        return None
+    try:
+        return METRICS.serve(int(port))
+    except OSError:
+        # Another replica on the host already has the port; this process
+        # goes unscraped rather than failing every page. Cached, so the bind
+        # is not retried on each rerun.
+        log.exception("metrics server could not bind port %s", port)
+        return None
+
+
+@st.cache_resource
+def start_api_server():
+    port = os.environ.get(API_PORT_ENV)
+    if not port:
+        return None
+    # Imported here so sessions without the API never load its server stack.
+    from viewer_core import api
+
+    return api.serve(int(port), lambda key, version: (*load_data(key, version), load_search(key, version)))
+
+
+@st.cache_resource
+def load_fragments():
+    # Rendered profiles for every dataset and session, evicted by size.
+    return FragmentCache()
+
+
+@st.cache_resource
+def load_prefetcher():
+    return Prefetcher(load_fragments())
+
+
+@st.cache_resource
+def load_reloader():
+    return Reloader(load_fragments())
+
+
+# -------------------------
+# Page
+# -------------------------
+def run(default_dataset=DEFAULT_DATASET):
+    """Render the viewer; `?dataset=<key>` or the sidebar picks the version."""
+    key = st.query_params.get("dataset", default_dataset)
+    if key not in ADAPTERS:
+        key = default_dataset
+    start_metrics_server()
+    start_api_server()
+    with METRICS.rerun(dataset=key) as rerun:
+        _page(key)
+    # Optional per-rerun breakdown, last in the sidebar.
+    if st.sidebar.toggle("Show timings", key="debug_timings"):
+        timings_panel(rerun, METRICS)
+
+
+def _page(key):
+    adapter = ADAPTERS[key]
+
+    st.set_page_config(page_title=adapter.title, layout="wide")
+    st.markdown(THEME_CSS, unsafe_allow_html=True)
+
+    def switch_dataset():
+        st.query_params["dataset"] = st.session_state.dataset
+        for name in list(st.session_state):
+            if name in PER_DATASET_STATE or name.startswith(FACET_KEY_PREFIX):
+                st.session_state.pop(name, None)
+
+    keys = list(ADAPTERS)
+    st.sidebar.selectbox(
+        "Dataset:",
+        keys,
+        index=keys.index(key),
+        format_func=lambda k: ADAPTERS[k].label or "Current",
+        key="dataset",
+        on_change=switch_dataset,
+    )
+    view = st.sidebar.radio("View:", ["Profile", "Table", "Compare", "Cleaning", "Dashboard", "Batch"], horizontal=True, key="view")
+
+    with METRICS.timed("load"):
+        reloader = load_reloader()
+        if adapter.needs_build():
+            if adapter.has_store():
+                # A newer CSV landed: apply it in the background and keep serving
+                # the current build until the updated one is ready.
+                reloader.start(adapter)
+            else:
+                # Cold load: stream the CSV into the store with visible progress.
+                # Sessions arriving meanwhile wait on the same build.
+                text = f"Loading {adapter.label or 'current'} dataset…"
+                bar = st.progress(0.0, text=text)
+                adapter.build(progress=lambda fraction: bar.progress(fraction, text=text))
+                bar.empty()
+        if reloader.running(key):
+            st.sidebar.caption("Applying a data update…")
+        elif reloader.failed(key):
+            st.sidebar.caption("The latest data update could not be applied; showing the previous build.")
+
+        version = adapter.version()
+        store, index = load_data(key, version)
+
+    st.markdown(FONT_CSS, unsafe_allow_html=True)
+    st.markdown(f"<h1 style='font-weight:700;'>📘 {adapter.title}</h1>", unsafe_allow_html=True)
+
+    # -------------------------
+    # Dropdown + Next/Prev Navigation
+    # -------------------------
+    physicians = index.labels
+
+    if "selected_index" not in st.session_state:
+        st.session_state.selected_index = 0
+    # Positions only hold within one build: after a reload, find the
+    # session's physician again by NPI, or stay near where it was if the
+    # update dropped them.
+    if st.session_state.get("selected_version", version) != version:
+        position = index.position_of_npi(st.session_state.selected_npi)
+        if position is not None:
+            st.session_state.selected_index = position
+        st.session_state.pop("selected_name", None)
+    st.session_state.selected_index = max(min(st.session_state.selected_index, len(index) - 1), 0)
+
+    def remember_selection():
+        st.session_state.selected_npi = int(index.npis[st.session_state.selected_index])
+        st.session_state.selected_version = version
+
+    with METRICS.timed("filters"):
+        # Facet filters narrow what the pickers offer and what Prev/Next walk.
+        filtered = load_facets(key, version).filter(facet_filters(load_facets(key, version)))
+        if filtered is not None:
+            st.sidebar.caption(f"{len(filtered):,} of {len(index):,} physicians match")
+            if not len(filtered):
+                st.info("No physicians match the selected filters.")
+                return
+            i = int(np.searchsorted(filtered, st.session_state.selected_index))
+            if i == len(filtered) or filtered[i] != st.session_state.selected_index:
+                st.session_state.selected_index = int(filtered[min(i, len(filtered) - 1)])
+        remember_selection()
+
+    # The filtered cohort (or everyone), in navigation order.
+    cohort = index.npis if filtered is None else index.npis[filtered]
+    export_panel(
+        EXPORT_FORMATS,
+        lambda fmt: export_stream(store, cohort, fmt),
+        len(cohort),
+        f"physicians_{key}",
+    )
+
+    if view == "Dashboard":
+        with METRICS.timed("dashboard"):
+            stats_dashboard(load_stats(key, version))
+        return
+
+    if view == "Batch":
+        # Match an uploaded NPI list in bulk.
+        with METRICS.timed("batch"):
+            batch_view(
+                parse_npis,
+                lambda tokens, npis: batch_lookup(store, index, tokens, npis),
+                version,
+                f"physicians_{key}",
+            )
+        return
+
+    if view == "Table":
+        # Browse mode: a page of compact rows instead of one profile.
+        with METRICS.timed("table"):
+            browse_table(lambda positions: browse_page(store, index, positions), len(index), filtered)
+        return
+
+    if view == "Compare":
+        # Field-level diff of this version against another, joined on NPI.
+        others = [k for k in keys if k != key]
+        other = st.sidebar.selectbox(
+            "Compare with:",
+            others,
+            format_func=lambda k: ADAPTERS[k].label or "Current",
+            key="compare_with",
+        )
+        with METRICS.timed("compare"):
+            if not ADAPTERS[other].has_store():
+                with st.spinner(f"Loading {ADAPTERS[other].label or 'current'} dataset…"):
+                    ADAPTERS[other].build()
+            diff = load_diff(key, version, other, ADAPTERS[other].version())
+            compare_view(diff, index, filtered, adapter.label or "Current", ADAPTERS[other].label or "Current")
+        return
+
+    if view == "Cleaning":
+        # raw.* against cleaned.*, from the change masks built with the store.
+        with METRICS.timed("cleaning"):
+            cleaning_view(load_cleaning(key, version), index, filtered)
+        return
+
+    def choose_physician():
+        st.session_state.selected_index = index.position(st.session_state.selected_name)
+
+    def choose_filtered():
+        st.session_state.selected_index = st.session_state.filtered_choice
+
+    # Row layout: dropdown on left, arrows far right
+    col_dd, col_spacer, col_prev, col_next = st.columns([0.33, 0.47, 0.10, 0.10])
+
+    with METRICS.timed("navigation"):
+        with col_dd:
+            if st.toggle("Search mode", value=len(physicians) > MAX_DROPDOWN_OPTIONS, key="search_mode"):
+                if st.toggle("Search experience & training", key="search_text"):
+                    search_picker(
+                        index,
+                        load_text(key, version),
+                        within=filtered,
+                        label="Search role, employer, residency, school:",
+                    )
+                else:
+                    search_picker(index, load_search(key, version), within=filtered)
+            elif filtered is not None:
+                options = filtered[:MAX_DROPDOWN_OPTIONS].tolist()
+                current = st.session_state.selected_index
+                st.selectbox(
+                    "Choose Physician:",
+                    options,
+                    key="filtered_choice",
+                    index=options.index(current) if current in options else None,
+                    format_func=lambda pos: physicians[pos],
+                    on_change=choose_filtered,
+                )
+            else:
+                st.selectbox(
+                    "Choose Physician:",
+                    physicians,
+                    key="selected_name",
+                    index=st.session_state.selected_index,
+                    on_change=choose_physician,
+                )
+
+        st.markdown(BUTTON_CSS, unsafe_allow_html=True)
+
+        with col_prev:
+            if st.button("⬅️ Prev", use_container_width=True):
+                st.session_state.selected_index = step(st.session_state.selected_index, -1, len(physicians), filtered)
+
+        with col_next:
+            if st.button("Next ➡️", use_container_width=True):
+                st.session_state.selected_index = step(st.session_state.selected_index, 1, len(physicians), filtered)
+
+    # -------------------------
+    # Profile: name, Experience / Residency / Medical School, Details
+    # -------------------------
+    with METRICS.timed("profile"):
+        # One pre-rendered fragment per physician; a repeat view is a cache lookup.
+        remember_selection()
+        current = st.session_state.selected_index
+        prefetcher = load_prefetcher()
+        npi = int(index.npis[current])
+        st.markdown(PROFILE_CSS, unsafe_allow_html=True)
+        st.markdown(prefetcher.profile_html(adapter, store, npi), unsafe_allow_html=True)
+
+        # Render the next and previous few in the background, so stepping
+        # through a review queue finds them ready.
+        ahead = (step(current, d, len(physicians), filtered) for d in range(1, PREFETCH_DEPTH + 1))
+        behind = (step(current, -d, len(physicians), filtered) for d in range(1, PREFETCH_DEPTH + 1))
+        neighbours = dict.fromkeys(p for pair in zip(ahead, behind) for p in pair if p != current)
+        prefetcher.prefetch(adapter, store, [int(index.npis[p]) for p in neighbours])
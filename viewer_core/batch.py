@@ -0,0 +1,64 @@
+"""Batch NPI lookup: match an uploaded list of NPIs against the store.
+
+Matching is one vectorised binary search of the whole list against the
+roster's sorted NPIs, not a lookup per NPI. The matched NPIs' key fields
+(BROWSE_COLUMNS) are then read in `BATCH_CHUNK_ROWS` hash joins against the
+store, so results stream back chunk by chunk in the order of the upload.
+"""
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from viewer_core.browse import browse_select
+
+# Input NPIs per result chunk (and per store join).
+BATCH_CHUNK_ROWS = 20_000
+
+MATCHED, NOT_FOUND, INVALID = "Matched", "Not found", "Invalid"
+
+
+def parse_npis(data):
+    """The NPIs listed in an upload, as (tokens, npis).
+
+    A CSV whose header names an NPI column (any header containing "npi") is
+    read from that column; anything else is taken as NPIs separated by
+    whitespace, commas or semicolons. `npis` is an int64 array aligned with
+    `tokens`, -1 where a token is not a number.
+    """
+    text = data.decode("utf-8-sig", errors="replace") if isinstance(data, bytes) else data
+    header = [h.strip().strip('"').lower() for h in text.partition("\n")[0].split(",")]
+    npi_columns = [i for i, h in enumerate(header) if "npi" in h]
+    if npi_columns:
+        tokens = pd.read_csv(io.StringIO(text), usecols=[npi_columns[0]], dtype=str).iloc[:, 0]
+        tokens = tokens.fillna("").str.strip().to_numpy(dtype=object)
+    else:
+        tokens = np.array([t for t in re.split(r"[\s,;]+", text) if t], dtype=object)
+    valid = np.array([t.isascii() and t.isdigit() and len(t) < 19 for t in tokens], dtype=bool)
+    npis = np.full(len(tokens), -1, dtype=np.int64)
+    npis[valid] = tokens[valid].astype(np.int64)
+    return tokens, npis
+
+
+def batch_lookup(store, index, tokens, npis, chunk_rows=BATCH_CHUNK_ROWS):
+    """Yield the lookup results for `tokens`/`npis` (see parse_npis) as
+    DataFrames of up to `chunk_rows` rows, in input order: the input, its
+    match status, then the key fields of matched profiles."""
+    select = browse_select(store)
+    for start in range(0, len(npis), chunk_rows):
+        part = npis[start:start + chunk_rows]
+        found = (index.positions_of_npis(part) >= 0) & (part > 0)
+        matched = np.unique(part[found])
+        fields = pd.concat(
+            [batch.to_pandas() for batch in store.stream(matched, select, len(matched) or 1)],
+            ignore_index=True,
+        )
+        fields = fields.drop_duplicates("NPI").set_index("NPI").reindex(part)
+        frame = pd.DataFrame({
+            "Input": tokens[start:start + chunk_rows],
+            "Status": np.where(part < 0, INVALID, np.where(found, MATCHED, NOT_FOUND)),
+        })
+        for column in fields.columns:
+            frame[column] = fields[column].to_numpy()
+        yield frame
@@ -0,0 +1,203 @@
+"""Benchmarks: load, lookup, navigation and render paths at several sizes.
+
+    python -m viewer_core.bench --sizes 1000 100000 1000000 --out bench.json
+
+For each schema (v5, v6, v7) and size, a synthetic enrichment CSV is made by
+repeating that version's sample rows with fresh names and NPIs, registered
+as a temporary dataset, and driven through the real app with Streamlit's
+AppTest. Times are in milliseconds (build in seconds). `--compare` with an
+earlier run's JSON flags timings that got slower by more than --tolerance
+(and by at least --min-ms), and exits non-zero if any did, so a deploy
+script can gate on it.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from viewer_core.adapters import ADAPTERS
+from viewer_core.render import profile_html
+from viewer_core.store import store_path
+
+SCHEMAS = ["v5", "v6", "v7"]
+SIZES = [1_000, 100_000, 1_000_000]
+# Timed repetitions per measurement; medians are reported.
+SAMPLES = 50
+CLICKS = 10
+# Slowdowns smaller than this are timer noise, whatever the relative change.
+MIN_REGRESSION_MS = 1.0
+# NPIs of synthetic rows start here, clear of the 10-digit range real ones use.
+FIRST_NPI = 90_000_000_000
+
+APP_SCRIPT = "from viewer_core.app import run\nrun(default_dataset={key!r})\n"
+
+
+def make_dataset(schema, rows, out_dir):
+    """Write `rows` synthetic rows in `schema`'s layout; returns the CSV path."""
+    path = os.path.join(out_dir, f"{schema}_{rows}.csv")
+    if os.path.exists(path):
+        return path
+    sample = pd.read_csv(ADAPTERS[schema].path, dtype=str)
+    npi_columns = [c for c in sample.columns if c.endswith("npi")]
+    written = 0
+    with open(path, "w", newline="") as f:
+        while written < rows:
+            batch = sample.head(rows - written).copy()
+            copy = written // len(sample)
+            batch["cleaned.name"] = batch["cleaned.name"].fillna("Unknown") + f" {copy}"
+            npis = [str(FIRST_NPI + written + i) for i in range(len(batch))]
+            for col in npi_columns:
+                batch[col] = npis
+            batch.to_csv(f, index=False, header=written == 0)
+            written += len(batch)
+    return path
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3)
+
+
+def _median_ms(fn, samples):
+    times = []
+    for arg in samples:
+        start = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - start)
+    return _ms(statistics.median(times))
+
+
+def bench_dataset(schema, rows, out_dir, samples=SAMPLES, clicks=CLICKS):
+    """Time one synthetic dataset; returns a result dict."""
+    from streamlit.testing.v1 import AppTest
+
+    from viewer_core.app import load_data
+
+    csv_path = make_dataset(schema, rows, out_dir)
+    key = f"bench-{schema}-{rows}"
+    adapter = type(ADAPTERS[schema])(key, f"Bench {schema} {rows:,}", csv_path)
+    ADAPTERS[key] = adapter
+    try:
+        result = {"schema": schema, "rows": rows}
+
+        # Always a full build, even when --dir kept the last run's store.
+        if adapter.has_store():
+            os.remove(store_path(csv_path))
+        start = time.perf_counter()
+        adapter.build()
+        result["build_s"] = round(time.perf_counter() - start, 3)
+
+        # Cold load: open the store and map its indexes, as a fresh process does.
+        load_data.clear()
+        start = time.perf_counter()
+        store, index = load_data(key, adapter.version())
+        result["load_data_ms"] = _ms(time.perf_counter() - start)
+
+        rng = random.Random(0)
+        picks = [rng.randrange(len(index)) for _ in range(samples)]
+        labels = [index.labels[p] for p in picks]
+        result["name_lookup_ms"] = _median_ms(index.position, labels)
+        npis = [int(index.npis[p]) for p in picks]
+        result["fetch_ms"] = _median_ms(lambda npi: store.fetch(npi=npi), npis)
+        profiles = [store.fetch(npi=npi) for npi in npis]
+        result["render_ms"] = _median_ms(lambda row: profile_html(adapter, row), profiles)
+
+        # The whole rerun, as a user sees it: first page, then Next/Prev clicks.
+        at = AppTest.from_string(APP_SCRIPT.format(key=key), default_timeout=600)
+        start = time.perf_counter()
+        at.run()
+        result["first_page_ms"] = _ms(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(f"{key}: {at.exception[0].message}")
+        for label, button in [("next_ms", 1), ("prev_ms", 0)]:
+            times = []
+            for _ in range(clicks):
+                start = time.perf_counter()
+                at.button[button].click().run()
+                times.append(time.perf_counter() - start)
+            result[label] = _ms(statistics.median(times))
+        return result
+    finally:
+        del ADAPTERS[key]
+
+
+def regressions(baseline, results, tolerance, min_ms=MIN_REGRESSION_MS):
+    """[(schema, rows, metric, old, new)] for timings more than `tolerance`
+    (a fraction) and at least `min_ms` milliseconds slower than in `baseline`."""
+    before = {(r["schema"], r["rows"]): r for r in baseline["results"]}
+    slower = []
+    for result in results:
+        old = before.get((result["schema"], result["rows"]))
+        if old is None:
+            continue
+        for metric, value in result.items():
+            if not metric.endswith(("_ms", "_s")) or metric not in old:
+                continue
+            slowdown_ms = (value - old[metric]) * (1 if metric.endswith("_ms") else 1000)
+            if value > old[metric] * (1 + tolerance) and slowdown_ms >= min_ms:
+                slower.append((result["schema"], result["rows"], metric, old[metric], value))
+    return slower
+
+
+def environment():
+    import duckdb
+    import pyarrow
+    import streamlit
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "duckdb": duckdb.__version__,
+        "pyarrow": pyarrow.__version__,
+        "streamlit": streamlit.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schemas", nargs="+", default=SCHEMAS, choices=SCHEMAS, help="dataset layouts to test")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="row counts to test")
+    parser.add_argument("--dir", help="where synthetic datasets are written and kept (default: a temp dir)")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="repetitions per lookup/render timing")
+    parser.add_argument("--clicks", type=int, default=CLICKS, help="Prev/Next clicks timed per dataset")
+    parser.add_argument("--out", help="write results here as JSON (default: stdout)")
+    parser.add_argument("--compare", help="earlier results JSON to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="slowdown allowed by --compare (0.25 = 25%%)")
+    parser.add_argument("--min-ms", type=float, default=MIN_REGRESSION_MS, help="smallest slowdown --compare reports, in ms")
+    args = parser.parse_args(argv)
+
+    out_dir = args.dir or tempfile.mkdtemp(prefix="viewer-bench-")
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    for schema in args.schemas:
+        for rows in args.sizes:
+            result = bench_dataset(schema, rows, out_dir, args.samples, args.clicks)
+            print(json.dumps(result), flush=True)
+            results.append(result)
+
+    report = {"environment": environment(), "results": results}
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print("results:", args.out)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            slower = regressions(json.load(f), results, args.tolerance, args.min_ms)
+        for schema, rows, metric, old, new in slower:
+            print(f"REGRESSION {schema} {rows:,} rows {metric}: {old} -> {new}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
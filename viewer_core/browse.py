@@ -0,0 +1,85 @@
+from collections.abc import Mapping
+
+import pandas as pd
+
+from viewer_core.store import NAME, NPI, quote
+
+# `end` values that mark a job as ongoing.
+ONGOING = {"", "present", "current", "now", "n/a"}
+
+
+def current_employer(entries):
+    """Employer of the ongoing job, else of the one that ended last."""
+    jobs = [e for e in entries or [] if isinstance(e, Mapping) and e.get("employer")]
+    if not jobs:
+        return ""
+    for job in jobs:
+        if str(job.get("end") or "").strip().lower() in ONGOING:
+            return job["employer"]
+    return max(jobs, key=lambda job: str(job.get("end") or ""))["employer"]
+
+
+def first_institution(entries):
+    for entry in entries or []:
+        if isinstance(entry, Mapping) and entry.get("institution"):
+            return entry["institution"]
+    return ""
+
+
+def _current_employer_sql(store, column):
+    """current_employer as a SQL expression (ties on `end` may pick another job)."""
+    pairs = f"list_zip({store.field_values(column, 'employer')}, {store.field_values(column, 'end')})"
+    jobs = f"list_filter({pairs}, lambda p: coalesce(p[1], '') <> '')"
+    ongoing = ", ".join(f"'{v}'" for v in sorted(ONGOING))
+    return (
+        f"coalesce(list_filter({jobs}, lambda p: lower(trim(coalesce(p[2], ''))) IN ({ongoing}))[1][1], "
+        f"list_reverse_sort(list_transform({jobs}, lambda p: struct_pack(e := coalesce(p[2], ''), n := p[1])))[1].n, '')"
+    )
+
+
+def _first_institution_sql(store, column):
+    return f"coalesce(list_filter({store.field_values(column, 'institution')}, lambda v: coalesce(v, '') <> '')[1], '')"
+
+
+_DERIVED_SQL = {current_employer: _current_employer_sql, first_institution: _first_institution_sql}
+
+
+# (header, source column, derivation). Columns the dataset lacks are left out.
+BROWSE_COLUMNS = [
+    ("Name", NAME, None),
+    ("NPI", NPI, None),
+    ("State", "state", None),
+    ("Current Employer", "cleaned.work_experience", current_employer),
+    ("Residency", "cleaned.residency", first_institution),
+    ("Medical School", "cleaned.medical_school", first_institution),
+]
+
+
+def browse_page(store, index, positions):
+    """DataFrame of BROWSE_COLUMNS for the roster `positions`, in order.
+
+    Only these rows are read from the store, so a page costs the same at
+    any offset and any dataset size.
+    """
+    columns = [c for c in BROWSE_COLUMNS if c[1] in store.columns]
+    npis = [int(index.npis[p]) for p in positions]
+    rows = store.fetch_many(npis, [source for _, source, _ in columns])
+    data = {header: [] for header, _, _ in columns}
+    for pos, row in zip(positions, rows):
+        for header, source, derive in columns:
+            if row is None:
+                # Gone from the store since the roster was read; the roster still has its name.
+                value = index.names[pos] if source == NAME else None
+            else:
+                value = row[source] if derive is None else derive(row[source])
+            data[header].append(value)
+    return pd.DataFrame(data)
+
+
+def browse_select(store):
+    """BROWSE_COLUMNS as a SQL select list over `store`, each aliased by its
+    header, for reading them in bulk without decoding the rows."""
+    return ", ".join(
+        f"{quote(source) if derive is None else _DERIVED_SQL[derive](store, source)} AS {quote(header)}"
+        for header, source, derive in BROWSE_COLUMNS if source in store.columns
+    )
@@ -0,0 +1,29 @@
+"""Offline converter: enrichment CSV -> pre-parsed Parquet.
+
+    python -m viewer_core.convert enrichment_clean.csv v7_viewer/viewer_data.csv
+
+The viewers pick up `<name>.parquet` automatically when it is newer than the
+CSV it was built from, and fall back to parsing the CSV otherwise.
+"""
+import argparse
+
+from viewer_core.dataset import convert_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", nargs="+", help="enrichment CSV file(s) to convert")
+    parser.add_argument(
+        "--columns",
+        nargs="+",
+        help="nested list columns to decode (default: every known one present in the file)",
+    )
+    args = parser.parse_args(argv)
+
+    for csv_path in args.csv:
+        out = convert_csv(csv_path, list_columns=args.columns)
+        print(f"{csv_path} -> {out}")
+
+
+if __name__ == "__main__":
+    main()
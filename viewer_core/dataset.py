@@ -0,0 +1,117 @@
+import ast
+import os
+from functools import lru_cache
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from viewer_core.model import entries
+
+# Columns that hold Python-literal lists of dicts in the enrichment CSVs.
+# Not every version carries all of them (v7 has no emails/insurance).
+LIST_COLUMNS = [
+    "cleaned.work_experience",
+    "cleaned.residency",
+    "cleaned.medical_school",
+    "cleaned.emails",
+    "cleaned.insurance_accepted",
+]
+
+# Low-cardinality flat columns, loaded dictionary-encoded (pandas category,
+# Arrow dictionary<int32, string>) instead of one string object per row.
+CATEGORICAL_COLUMNS = ["license_state", "state", "city"]
+# ...plus every cleaned column ending in one of these (v5/v6 confidences,
+# cleaned.years_experience.inferred).
+CATEGORICAL_SUFFIXES = (".confidence", ".inferred")
+
+# How many decoded list cells decode_cached() keeps around.
+DECODE_CACHE_SIZE = 4096
+
+
+def categorical_columns(columns):
+    """The columns of `columns` that are loaded dictionary-encoded."""
+    return [
+        c for c in columns
+        if c in CATEGORICAL_COLUMNS or (c.startswith("cleaned.") and c.endswith(CATEGORICAL_SUFFIXES))
+    ]
+
+
+def parse_literal(x):
+    """Decode one CSV cell holding a Python list literal; anything else is []."""
+    return ast.literal_eval(x) if isinstance(x, str) and x.startswith("[") else []
+
+
+@lru_cache(maxsize=DECODE_CACHE_SIZE)
+def _decode_text(text):
+    return entries(ast.literal_eval(text))
+
+
+def decode_cached(x):
+    """parse_literal() behind a bounded LRU keyed by the raw text.
+
+    Revisiting a profile (or entries identical across profiles, like "[]")
+    costs a dict lookup. Cells come back as tuples of compact, read-only
+    `viewer_core.model.Entry` records, shared between callers.
+    """
+    return _decode_text(x) if isinstance(x, str) and x.startswith("[") else ()
+
+
+def columnar_path(csv_path):
+    """Where the pre-parsed columnar copy of `csv_path` lives."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+# Written last by viewer_core.precompute, after every shard it lists.
+MANIFEST = "manifest.json"
+
+
+def precomputed_dir(csv_path):
+    """Where the shards and manifest for `csv_path` are written by default."""
+    return os.path.splitext(csv_path)[0] + "_precomputed"
+
+
+def fresh_manifest(csv_path, out_dir=None):
+    """Path of the manifest if it was built from the current `csv_path`, else None."""
+    path = os.path.join(out_dir or precomputed_dir(csv_path), MANIFEST)
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+        return path
+    return None
+
+
+# -------------------------
+# Columnar (Parquet with nested list<struct> columns)
+# -------------------------
+# CSV rows normalized per Parquet row group.
+COLUMNAR_CHUNK_ROWS = 50_000
+
+
+def convert_csv(csv_path, list_columns=None, out_path=None, chunk_rows=COLUMNAR_CHUNK_ROWS):
+    """Parse `csv_path` once and write the typed columnar copy next to it.
+
+    Rows go through `normalize_chunk`, as precompute's shards do, so the copy
+    has the store's fixed nested schema (every entry field, `source` as a
+    list) whatever entries the file happens to hold.
+    """
+    from viewer_core.normalize import normalize_chunk
+
+    out_path = out_path or columnar_path(csv_path)
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if list_columns is None:
+        list_columns = [c for c in LIST_COLUMNS if c in header]
+    tmp = out_path + ".tmp"
+    writer = None
+    try:
+        for chunk in pd.read_csv(csv_path, dtype=str, chunksize=chunk_rows):
+            table, _ = normalize_chunk(chunk, list_columns)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            # No rows: still write the schema.
+            table, _ = normalize_chunk(pd.DataFrame(columns=header, dtype=str), list_columns)
+            pq.write_table(table, tmp)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp, out_path)
+    return out_path
@@ -0,0 +1,290 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from viewer_core.index import open_shared_table
+from viewer_core.store import NAME, NPI, TABLE, quote
+
+# (key, label, column, fields). Entry fields are compared as sets of values
+# (joined with "–" when there are two, e.g. "2010–2014"); fields=None compares
+# a flat column's value. Only fields both versions have are compared.
+DIFF_FIELDS = [
+    ("name", "Name", NAME, None),
+    ("employers", "Employers", "cleaned.work_experience", ("employer",)),
+    ("residency", "Residency", "cleaned.residency", ("institution",)),
+    ("residency_years", "Residency Years", "cleaned.residency", ("start_year", "end_year")),
+    ("medical_school", "Medical School", "cleaned.medical_school", ("institution",)),
+    ("medical_school_years", "Medical School Years", "cleaned.medical_school", ("start_year", "end_year")),
+    ("years_experience", "Years Experience", "cleaned.years_experience.value", None),
+    ("linkedin", "LinkedIn", "cleaned.linkedin_url.url", None),
+    ("doximity", "Doximity", "cleaned.doximity_url.url", None),
+]
+
+# (key, label, column suffix, fields) compared between raw.<suffix> and
+# cleaned.<suffix> in one version, as for DIFF_FIELDS.
+CLEANING_FIELDS = [
+    ("employers", "Employers", "work_experience", ("employer",)),
+    ("residency", "Residency", "residency", ("institution",)),
+    ("medical_school", "Medical School", "medical_school", ("institution",)),
+    ("emails", "Emails", "emails", ("email",)),
+    ("insurance", "Insurance", "insurance_accepted", ("insurance",)),
+    ("years_experience", "Years Experience", "years_experience.value", None),
+    ("years_confidence", "Years Confidence", "years_experience.confidence", None),
+    ("linkedin", "LinkedIn", "linkedin_url.url", None),
+    ("linkedin_confidence", "LinkedIn Confidence", "linkedin_url.confidence", None),
+    ("doximity", "Doximity", "doximity_url.url", None),
+    ("doximity_confidence", "Doximity Confidence", "doximity_url.confidence", None),
+]
+
+# `side` of a diff row: which versions have the NPI.
+LEFT, RIGHT, BOTH = 1, 2, 3
+
+
+def _clean(value):
+    # Stores loaded from Parquet can hold DOUBLE columns (numbers, or URLs
+    # that were all empty), so values are compared as text.
+    return f"nullif(nullif(trim({value}::VARCHAR), ''), 'N/A')"
+
+
+def _field_sql(store, column, fields):
+    """SQL for one version's side of a field: a sorted, distinct list of
+    values for entry fields, or the cleaned value of a flat column."""
+    if fields is None:
+        value = quote(column)
+        if store.column_type(column) in ("DOUBLE", "FLOAT"):
+            # Whole numbers from Parquet read as 20.0; match the CSV's "20".
+            value = f"CASE WHEN {value} = trunc({value}) THEN {value}::BIGINT::VARCHAR ELSE {value}::VARCHAR END"
+        return _clean(value)
+    if len(fields) == 1:
+        values = f"list_transform({store.field_values(column, fields[0])}, lambda v: {_clean('v')})"
+    else:
+        start, end = _clean("p[1]"), _clean("p[2]")
+        pairs = f"list_zip({store.field_values(column, fields[0])}, {store.field_values(column, fields[1])})"
+        values = (
+            f"list_transform({pairs}, lambda p: CASE WHEN {start} IS NULL AND {end} IS NULL THEN NULL "
+            f"ELSE coalesce({start}, '?') || '–' || coalesce({end}, '?') END)"
+        )
+    return f"coalesce(list_sort(list_distinct({values})), []::VARCHAR[])"
+
+
+def _attach(con, alias, store):
+    path = store.db_path.replace("'", "''")
+    con.execute(f"ATTACH '{path}' AS {alias} (READ_ONLY)")
+
+
+class VersionDiff:
+    """Field-level diff of two dataset versions, one row per NPI in either.
+
+    Built by a DuckDB hash join on cleaned.npi over both stores and
+    memory-mapped next to the left store, tagged with both store versions.
+    Only differences are kept: entry fields hold what the right version
+    added and removed, flat fields both values where they differ. `changed`
+    is a bitmask over `fields`.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.npis = table.column("npi").to_numpy()
+        self.sides = table.column("side").to_numpy()
+        self.changed = table.column("changed").to_numpy()
+        names = set(table.column_names)
+        self.fields = [
+            (key, label, fields is not None)
+            for key, label, _, fields in DIFF_FIELDS
+            if f"{key}_added" in names or f"{key}_left" in names
+        ]
+        self._bits = {key: 1 << i for i, (key, _, _) in enumerate(self.fields)}
+
+    @staticmethod
+    def build_table(left, right):
+        fields = [f for f in DIFF_FIELDS if f[2] in left.columns and f[2] in right.columns]
+        con = duckdb.connect()
+        for side, store in [("l", left), ("r", right)]:
+            _attach(con, f"{side}_store", store)
+            select = [f"{quote(NPI)} AS npi"]
+            select += [f"{_field_sql(store, column, f)} AS {key}" for key, _, column, f in fields]
+            con.execute(
+                f"CREATE TEMP TABLE {side} AS SELECT DISTINCT ON (npi) {', '.join(select)} "
+                f"FROM {side}_store.{TABLE} WHERE {quote(NPI)} IS NOT NULL"
+            )
+
+        both = "l.npi IS NOT NULL AND r.npi IS NOT NULL"
+        select = [
+            "coalesce(l.npi, r.npi) AS npi",
+            f"(CASE WHEN r.npi IS NULL THEN {LEFT} WHEN l.npi IS NULL THEN {RIGHT} ELSE {BOTH} END)::TINYINT AS side",
+        ]
+        bits = []
+        for i, (key, _, _, f) in enumerate(fields):
+            if f is None:
+                differs = f"l.{key} IS DISTINCT FROM r.{key}"
+                select += [
+                    f"CASE WHEN {both} AND {differs} THEN l.{key} END AS {key}_left",
+                    f"CASE WHEN {both} AND {differs} THEN r.{key} END AS {key}_right",
+                ]
+            else:
+                select += [
+                    f"CASE WHEN {both} THEN list_filter(r.{key}, lambda v: NOT list_contains(l.{key}, v)) END AS {key}_added",
+                    f"CASE WHEN {both} THEN list_filter(l.{key}, lambda v: NOT list_contains(r.{key}, v)) END AS {key}_removed",
+                ]
+                differs = f"l.{key} <> r.{key}"
+            bits.append(f"CASE WHEN {both} AND {differs} THEN {1 << i} ELSE 0 END")
+        select.append(f"({' + '.join(bits) or '0'})::UINTEGER AS changed")
+        return con.execute(
+            f"SELECT {', '.join(select)} FROM l FULL OUTER JOIN r ON l.npi = r.npi ORDER BY 1"
+        ).to_arrow_table().combine_chunks()
+
+    @classmethod
+    def open_shared(cls, left, right, right_key):
+        return cls(open_shared_table(
+            left,
+            f"diff-{right_key}",
+            lambda: cls.build_table(left, right),
+            version=f"{left.version}:{right.version}",
+        ))
+
+    def summary(self):
+        """{"both"/"left"/"right": NPIs, and each field key: NPIs where it changed}."""
+        counts = {
+            "both": int((self.sides == BOTH).sum()),
+            "left": int((self.sides == LEFT).sum()),
+            "right": int((self.sides == RIGHT).sum()),
+        }
+        for key, bit in self._bits.items():
+            counts[key] = int(np.count_nonzero(self.changed & bit))
+        return counts
+
+    def changed_npis(self, fields=None):
+        """Sorted NPIs in both versions where any of `fields` (all if None) changed."""
+        mask = sum(self._bits[key] for key in fields) if fields else sum(self._bits.values())
+        return self.npis[(self.changed & mask) != 0]
+
+    def changed_labels(self, npi):
+        """Labels of the fields that changed for `npi`."""
+        i = self._find(npi)
+        return [] if i is None else [label for key, label, _ in self.fields if self.changed[i] & self._bits[key]]
+
+    def _find(self, npi):
+        i = int(np.searchsorted(self.npis, npi))
+        return i if i < len(self.npis) and self.npis[i] == npi else None
+
+    def side_by_side(self, npi, left_label, right_label):
+        """DataFrame of the fields that changed for `npi`, one row each: the
+        values each version has and the other doesn't. None unless both
+        versions have the NPI."""
+        i = self._find(npi)
+        if i is None or self.sides[i] != BOTH:
+            return None
+        row = self.table.slice(i, 1).to_pylist()[0]
+        rows = []
+        for key, label, entries in self.fields:
+            if self.changed[i] & self._bits[key]:
+                if entries:
+                    rows.append((label, "; ".join(row[f"{key}_removed"]), "; ".join(row[f"{key}_added"])))
+                else:
+                    rows.append((label, row[f"{key}_left"] or "", row[f"{key}_right"] or ""))
+        return pd.DataFrame(rows, columns=["Field", left_label, right_label])
+
+
+class CleaningDiff:
+    """What cleaning changed in one version: raw.* against cleaned.* per
+    profile, for the fields in CLEANING_FIELDS that the version carries.
+
+    Built once per store build (next to the facet and text indexes), one row
+    per roster position. `mask` has a bit per kind of change, so a filter
+    like "cleaning dropped an employer" is a bitwise test over one array
+    rather than a reparse of both literal columns.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.mask = table.column("mask").to_numpy()
+        names = set(table.column_names)
+        # (change key, label): entry fields can have values dropped or
+        # added by cleaning, flat fields are changed (or blanked).
+        self.changes = []
+        for key, label, _, fields in CLEANING_FIELDS:
+            if fields is not None and f"{key}_dropped" in names:
+                self.changes += [(f"{key}_dropped", f"{label} dropped"), (f"{key}_added", f"{label} added")]
+            elif fields is None and f"{key}_raw" in names:
+                self.changes.append((f"{key}_changed", f"{label} changed"))
+        self._bits = {change: 1 << i for i, (change, _) in enumerate(self.changes)}
+
+    @staticmethod
+    def build_table(store, index):
+        fields = [
+            f for f in CLEANING_FIELDS
+            if f"raw.{f[2]}" in store.columns and f"cleaned.{f[2]}" in store.columns
+        ]
+        con = duckdb.connect()
+        _attach(con, "source", store)
+        con.register("roster", pa.table({
+            "npi": pa.array(np.asarray(index.npis), pa.int64()),
+            "position": pa.array(np.arange(len(index), dtype=np.int32)),
+        }))
+        select = [f"{quote(NPI)} AS npi"]
+        for key, _, suffix, f in fields:
+            select += [
+                f"{_field_sql(store, f'raw.{suffix}', f)} AS raw_{key}",
+                f"{_field_sql(store, f'cleaned.{suffix}', f)} AS cleaned_{key}",
+            ]
+        con.execute(
+            f"CREATE TEMP TABLE p AS SELECT DISTINCT ON (npi) {', '.join(select)} "
+            f"FROM source.{TABLE} WHERE {quote(NPI)} IS NOT NULL"
+        )
+
+        select, bits = [], []
+        for key, _, _, f in fields:
+            raw, cleaned = f"p.raw_{key}", f"p.cleaned_{key}"
+            if f is None:
+                differs = f"{raw} IS DISTINCT FROM {cleaned}"
+                select += [
+                    f"CASE WHEN {differs} THEN {raw} END AS {key}_raw",
+                    f"CASE WHEN {differs} THEN {cleaned} END AS {key}_cleaned",
+                ]
+                bits.append(f"{key}_raw IS NOT NULL OR {key}_cleaned IS NOT NULL")
+            else:
+                select += [
+                    f"list_filter({raw}, lambda v: NOT list_contains({cleaned}, v)) AS {key}_dropped",
+                    f"list_filter({cleaned}, lambda v: NOT list_contains({raw}, v)) AS {key}_added",
+                ]
+                bits += [f"len({key}_dropped) > 0", f"len({key}_added) > 0"]
+        mask = " + ".join(f"CASE WHEN {b} THEN {1 << i} ELSE 0 END" for i, b in enumerate(bits))
+        # Two steps so the bit tests can refer to the lists selected above.
+        con.execute(
+            f"CREATE TEMP TABLE d AS SELECT roster.position, {', '.join(select) or 'NULL AS nothing'} "
+            f"FROM roster LEFT JOIN p ON p.npi = roster.npi"
+        )
+        return con.execute(
+            f"SELECT * EXCLUDE (position), ({mask or '0'})::UINTEGER AS mask FROM d ORDER BY position"
+        ).to_arrow_table().combine_chunks()
+
+    @classmethod
+    def open_shared(cls, store, index):
+        return cls(open_shared_table(store, "cleaning", lambda: cls.build_table(store, index)))
+
+    def summary(self):
+        """{change key: profiles with that change}."""
+        return {change: int(np.count_nonzero(self.mask & bit)) for change, bit in self._bits.items()}
+
+    def positions(self, changes=None):
+        """Sorted roster positions with any of `changes` (any change if None)."""
+        bits = sum(self._bits[c] for c in changes) if changes else sum(self._bits.values())
+        return np.flatnonzero(self.mask & bits).astype(np.int32)
+
+    def change_labels(self, position):
+        return [label for change, label in self.changes if self.mask[position] & self._bits[change]]
+
+    def side_by_side(self, position):
+        """DataFrame of the fields cleaning changed at `position`: what raw
+        had that cleaned doesn't, and the reverse."""
+        row = self.table.slice(position, 1).to_pylist()[0]
+        mask = self.mask[position]
+        rows = []
+        for key, label, _, fields in CLEANING_FIELDS:
+            if fields is None:
+                if mask & self._bits.get(f"{key}_changed", 0):
+                    rows.append((label, row[f"{key}_raw"] or "", row[f"{key}_cleaned"] or ""))
+            elif mask & (self._bits.get(f"{key}_dropped", 0) | self._bits.get(f"{key}_added", 0)):
+                rows.append((label, "; ".join(row[f"{key}_dropped"]), "; ".join(row[f"{key}_added"])))
+        return pd.DataFrame(rows, columns=["Field", "Raw", "Cleaned"])
@@ -0,0 +1,91 @@
+"""Bulk export of a cohort of profiles as CSV, JSONL or Parquet.
+
+Rows stream out of the store `EXPORT_CHUNK_ROWS` profiles at a time. Each
+chunk is encoded and yielded as bytes before the next one is read, so memory
+stays bounded by one chunk whatever the size of the cohort. Nested list
+columns are flattened in SQL into one column per entry field, e.g.
+`cleaned.work_experience.employer`, with the entries' values joined by
+`SEPARATOR`.
+"""
+import io
+import json
+
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from viewer_core.model import ENTRY_FIELDS
+from viewer_core.store import quote
+
+# format -> MIME type
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Profiles per store query, and per CSV block / Parquet row group.
+EXPORT_CHUNK_ROWS = 10_000
+SEPARATOR = "; "
+
+
+def export_columns(store):
+    """[(name, SQL expression)] for an export of `store`'s profiles.
+
+    Flat columns pass through; raw.* input columns are left out. List columns
+    become one column per entry field (their sources are not exported).
+    """
+    columns = []
+    for column in store.columns:
+        if column.startswith("raw."):
+            continue
+        if column in store.list_columns:
+            for field in ENTRY_FIELDS.get(column, ()):
+                values = store.field_values(column, field)
+                columns.append((f"{column}.{field}", f"array_to_string({values}, '{SEPARATOR}')"))
+        else:
+            columns.append((column, quote(column)))
+    return columns
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file the Arrow writers encode into, emptied after every chunk."""
+
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._size += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._size
+
+    def drain(self):
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def export_stream(store, npis, fmt, chunk_rows=EXPORT_CHUNK_ROWS, progress=None):
+    """Yield the profiles for `npis`, in that order, encoded as `fmt` (a key of
+    EXPORT_FORMATS) in consecutive byte chunks."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"unknown export format {fmt!r}")
+    select = ", ".join(f"{expr} AS {quote(name)}" for name, expr in export_columns(store))
+    sink = _Sink()
+    writer = None
+    for batch in store.stream(npis, select, chunk_rows, progress):
+        if fmt == "jsonl":
+            sink.write("".join(json.dumps(row) + "\n" for row in batch.to_pylist()).encode())
+        else:
+            if writer is None:
+                writer = pacsv.CSVWriter(sink, batch.schema) if fmt == "csv" else pq.ParquetWriter(sink, batch.schema)
+            writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
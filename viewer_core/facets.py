@@ -0,0 +1,141 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from viewer_core.index import open_shared_table, postings
+from viewer_core.store import NPI, TABLE, quote
+
+# (key, label, column, field inside the column's entries; None for a flat column).
+# Only facets whose column the dataset has are built (v7 alone has the
+# license/location columns).
+FACETS = [
+    ("license_state", "License State", "license_state", None),
+    ("state", "State", "state", None),
+    ("city", "City", "city", None),
+    ("employer", "Employer", "cleaned.work_experience", "employer"),
+    ("residency", "Residency", "cleaned.residency", "institution"),
+    ("medical_school", "Medical School", "cleaned.medical_school", "institution"),
+]
+
+MISSING = ["", "N/A"]
+
+
+class FacetIndex:
+    """Inverted index (facet, value) -> sorted row positions.
+
+    One Arrow row per (facet, value) holding its positions as list<int32>,
+    built with vectorized Arrow/NumPy ops at load time and memory-mapped
+    like the roster. A filter unions the values picked within a facet and
+    intersects across facets, smallest set first.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        keys = zip(table.column("facet").to_pylist(), table.column("value").to_pylist())
+        self._row = {key: i for i, key in enumerate(keys)}
+        chunks = table.column("positions").chunks
+        positions = chunks[0] if chunks else pa.array([], pa.list_(pa.int32()))
+        self._offsets = positions.offsets.to_numpy(zero_copy_only=True)
+        self._positions = positions.values.to_numpy(zero_copy_only=True)
+        self._counts = table.column("count").to_numpy()
+        present = set(k for k, _ in self._row)
+        self.facets = [(key, label) for key, label, _, _ in FACETS if key in present]
+        # Per facet, its rows most common value first, and those values.
+        self._ranked = {}
+        ranked = table.select(["facet", "value", "count"]).append_column(
+            "row", pa.array(np.arange(table.num_rows, dtype=np.int32))
+        )
+        for key, _ in self.facets:
+            rows = ranked.filter(pc.equal(ranked.column("facet"), key))
+            rows = rows.take(pc.sort_indices(rows, [("count", "descending"), ("value", "ascending")]))
+            self._ranked[key] = (rows.column("row").to_numpy(), rows.column("value").combine_chunks())
+
+    @staticmethod
+    def build_table(store, index):
+        batches = []
+        for key, _, column, field in FACETS:
+            if column not in store.columns:
+                continue
+            if field is None:
+                pairs = store.query(
+                    f"SELECT {quote(NPI)} AS npi, {quote(column)}::VARCHAR AS value FROM {TABLE}"
+                ).to_arrow_table()
+            else:
+                pairs = store.nested_values(column, field)
+            batches.append(_group(key, pairs, index))
+        schema = pa.schema([
+            ("facet", pa.string()),
+            ("value", pa.string()),
+            ("count", pa.int32()),
+            ("positions", pa.list_(pa.int32())),
+        ])
+        return pa.Table.from_batches([b for b in batches if b.num_rows], schema=schema).combine_chunks()
+
+    @classmethod
+    def open_shared(cls, store, index):
+        return cls(open_shared_table(store, "facets", lambda: cls.build_table(store, index)))
+
+    def positions(self, facet, value):
+        i = self._row.get((facet, value))
+        if i is None:
+            return np.empty(0, np.int32)
+        return self._positions[self._offsets[i]:self._offsets[i + 1]]
+
+    def size(self, facet):
+        """How many distinct values `facet` has."""
+        return len(self._ranked[facet][0]) if facet in self._ranked else 0
+
+    def count(self, facet, value):
+        i = self._row.get((facet, value))
+        return 0 if i is None else int(self._counts[i])
+
+    def options(self, facet, limit=None, query=None):
+        """[(value, count)] for `facet`, most common first; only values
+        containing `query` (case-insensitive) if one is given."""
+        if facet not in self._ranked:
+            return []
+        rows, values = self._ranked[facet]
+        if query:
+            hits = np.flatnonzero(
+                pc.match_substring(values, query, ignore_case=True).to_numpy(zero_copy_only=False)
+            )
+        else:
+            hits = np.arange(len(rows))
+        if limit:
+            hits = hits[:limit]
+        return [(values[i].as_py(), int(self._counts[rows[i]])) for i in hits]
+
+    def filter(self, selection):
+        """Sorted positions matching {facet: [values]}, or None if nothing is picked."""
+        sets = []
+        for facet, values in selection.items():
+            if values:
+                hits = [self.positions(facet, v) for v in values]
+                sets.append(hits[0] if len(hits) == 1 else np.unique(np.concatenate(hits)))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
+
+
+def _group(facet, pairs, index):
+    """One facet's (npi, value) pairs -> a record batch of value -> positions."""
+    values = pc.utf8_trim_whitespace(pairs.column("value").cast(pa.string()))
+    positions = index.positions_of_npis(pc.fill_null(pairs.column("npi"), 0).to_numpy())
+    keep = pc.and_(pc.is_valid(values), pc.invert(pc.is_in(values, pa.array(MISSING))))
+    keep = np.asarray(keep.to_numpy(zero_copy_only=False), bool) & (positions >= 0)
+    encoded = pc.dictionary_encode(values.filter(pa.array(keep))).combine_chunks()
+    # An entry can repeat within one profile (two stints at one employer).
+    codes, offsets, positions, _ = postings(encoded.indices.to_numpy(), positions[keep])
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([facet] * len(codes), pa.string()),
+            encoded.dictionary.take(pa.array(codes)),
+            pa.array(np.diff(offsets), pa.int32()),
+            pa.ListArray.from_arrays(pa.array(offsets), pa.array(positions)),
+        ],
+        names=["facet", "value", "count", "positions"],
+    )
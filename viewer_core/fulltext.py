@@ -0,0 +1,165 @@
+from bisect import bisect_left
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from viewer_core.index import _Strings, open_shared_table, postings
+from viewer_core.search import EXACT, PREFIX, tokenize
+
+# (column, field inside its entries, weight). What someone did and where they
+# trained outranks where a job happened to be.
+TEXT_FIELDS = [
+    ("cleaned.work_experience", "role", 3),
+    ("cleaned.work_experience", "employer", 3),
+    ("cleaned.work_experience", "location", 1),
+    ("cleaned.residency", "institution", 2),
+    ("cleaned.medical_school", "institution", 2),
+]
+
+# Only the last query term matches as a prefix (typeahead), and only from
+# this length, so a one-letter term never expands to half the vocabulary.
+MIN_PREFIX = 3
+
+# Intersections of lists within this size ratio go through a dense array
+# rather than binary search.
+DENSE_RATIO = 16
+
+_EMPTY = np.empty(0, np.int32)
+
+
+class TextIndex:
+    """Full-text index over the entries of the nested list columns.
+
+    token -> (positions, weights) in CSR form over a sorted vocabulary, built
+    with Arrow compute at ingest and persisted as a memory-mapped Arrow file
+    next to the roster. Every query term must match; each contributes its
+    best field weight x idf, and results rank by total score, then by
+    navigation order. Positions are those of `PhysicianIndex`.
+    """
+
+    def __init__(self, table, size):
+        self._size = size
+        self.vocab = _Strings(table.column("token").chunk(0))
+        positions = table.column("positions").chunk(0)
+        weights = table.column("weights").chunk(0)
+        self._offsets = positions.offsets.to_numpy()
+        self._positions = positions.values.to_numpy()
+        self._weights = weights.values.to_numpy()
+        df = np.maximum(np.diff(self._offsets), 1)
+        self._idf = np.log1p(size / df).astype(np.float32)
+
+    @staticmethod
+    def build_table(store, index):
+        tokens, positions, weights = [], [], []
+        for column, field, weight in TEXT_FIELDS:
+            if column not in store.columns:
+                continue
+            pairs = store.nested_values(column, field)
+            words = pc.split_pattern_regex(pc.utf8_lower(pairs.column("value").cast(pa.string())), r"[^a-z0-9]+")
+            words = words.combine_chunks() if isinstance(words, pa.ChunkedArray) else words
+            parents = pc.list_parent_indices(words).to_numpy()
+            flat = pc.list_flatten(words)
+            keep = pc.greater(pc.utf8_length(flat), 0)
+            row_positions = index.positions_of_npis(pc.fill_null(pairs.column("npi"), 0).to_numpy())[parents]
+            keep = np.asarray(keep.to_numpy(zero_copy_only=False), bool) & (row_positions >= 0)
+            tokens.append(flat.filter(pa.array(keep)))
+            positions.append(row_positions[keep])
+            weights.append(np.full(int(keep.sum()), weight, np.int8))
+
+        tokens = pa.chunked_array(tokens, pa.string()).combine_chunks() if tokens else pa.array([], pa.string())
+        encoded = pc.dictionary_encode(tokens)
+        # Codes in vocabulary order, so every token sharing a prefix is one
+        # contiguous run of postings.
+        rank = np.empty(len(encoded.dictionary), np.int64)
+        rank[pc.array_sort_indices(encoded.dictionary).to_numpy()] = np.arange(len(rank))
+        codes, offsets, positions, weights = postings(
+            rank[encoded.indices.to_numpy()],
+            np.concatenate(positions) if positions else _EMPTY,
+            np.concatenate(weights) if weights else np.empty(0, np.int8),
+        )
+        vocab = encoded.dictionary.take(pa.array(np.argsort(rank)[codes]))
+        return pa.table({
+            "token": vocab,
+            "positions": pa.ListArray.from_arrays(pa.array(offsets), pa.array(positions)),
+            "weights": pa.ListArray.from_arrays(pa.array(offsets), pa.array(weights, pa.int8())),
+        })
+
+    @classmethod
+    def open_shared(cls, store, index):
+        return cls(open_shared_table(store, "text", lambda: cls.build_table(store, index)), len(index))
+
+    def _term_scores(self, term, prefix):
+        """Sorted positions matching `term` and the best score at each."""
+        lo = bisect_left(self.vocab, term)
+        exact = lo < len(self.vocab) and self.vocab[lo] == term
+        hi = bisect_left(self.vocab, term + "\uffff", lo) if prefix else lo + exact
+        if hi - lo == 1:
+            run = slice(self._offsets[lo], self._offsets[hi])
+            kind = EXACT if exact else PREFIX
+            return self._positions[run], self._weights[run] * (kind * self._idf[lo])
+        if lo == hi:
+            return _EMPTY, np.empty(0, np.float32)
+        # Several tokens share the prefix: each run is sorted and unique, so
+        # merging them through a dense max is cheaper than sorting their union.
+        best = np.zeros(self._size, np.float32)
+        for tid in range(lo, hi):
+            run = slice(self._offsets[tid], self._offsets[tid + 1])
+            kind = EXACT if exact and tid == lo else PREFIX
+            hit = self._positions[run]
+            best[hit] = np.maximum(best[hit], self._weights[run] * (kind * self._idf[tid]))
+        positions = np.flatnonzero(best).astype(np.int32)
+        return positions, best[positions]
+
+    def search(self, query, limit=25, within=None):
+        """Top `limit` positions whose entries match every term of `query`.
+
+        `within`, a sorted array of positions (e.g. a facet filter), restricts
+        the matches before ranking.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        last = len(terms) - 1
+        positions, scores = None, None
+        for i, term in enumerate(terms):
+            more, more_scores = self._term_scores(term, i == last and len(term) >= MIN_PREFIX)
+            if positions is None:
+                positions, scores = more, more_scores
+            else:
+                i, j = self._intersect(positions, more)
+                positions, scores = positions[i], scores[i] + more_scores[j]
+            if not len(positions):
+                return []
+        if within is not None:
+            i, _ = self._intersect(positions, within)
+            positions, scores = positions[i], scores[i]
+        # Higher score first, then navigation order. Positions are already
+        # ascending, so ties at the cutoff are taken in order without a sort.
+        if len(positions) > limit:
+            cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            above = np.flatnonzero(scores > cutoff)
+            tied = np.flatnonzero(scores == cutoff)[:limit - len(above)]
+            keep = np.concatenate([above, tied])
+            positions, scores = positions[keep], scores[keep]
+        order = np.lexsort((positions, -scores))[:limit]
+        return positions[order].tolist()
+
+    def _intersect(self, a, b):
+        """Indices into sorted, unique position arrays `a` and `b` of the
+        positions they share."""
+        if len(a) > len(b):
+            j, i = self._intersect(b, a)
+            return i, j
+        if len(a) * DENSE_RATIO < len(b):
+            # Binary-search the few into the many.
+            j = np.searchsorted(b, a)
+            j[j == len(b)] = 0
+            i = np.flatnonzero(b[j] == a) if len(b) else np.empty(0, np.int64)
+            return i, j[i]
+        # Comparable sizes: one pass each through a dense slot array.
+        slot = np.full(self._size, -1, np.int32)
+        slot[b] = np.arange(len(b), dtype=np.int32)
+        j = slot[a]
+        i = np.flatnonzero(j >= 0)
+        return i, j[i]
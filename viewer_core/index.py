@@ -0,0 +1,170 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pyarrow as pa
+
+from viewer_core.store import NAME, NPI, TABLE, quote
+
+
+def shared_path(store, kind):
+    """A memory-mapped index file that sits next to a store."""
+    return f"{os.path.splitext(store.db_path)[0]}.{kind}.arrow"
+
+
+def map_shared(path):
+    """Arrow table backed by a read-only memory map of `path`."""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def open_shared_table(store, kind, build, version=None):
+    """Map the `kind` index file for `store`, writing it with `build()` first
+    if it is missing or was made from another build of the store (or with
+    another `version`, for files derived from more than one store).
+
+    Concurrent writers (threads or processes) each write a private temp file
+    and rename it into place, so readers only ever see a complete file.
+    """
+    path = shared_path(store, kind)
+    version = (version or store.version).encode()
+    if os.path.exists(path):
+        table = map_shared(path)
+        if (table.schema.metadata or {}).get(b"store_version") == version:
+            return table
+    table = build().replace_schema_metadata({"store_version": version})
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    return map_shared(path)
+
+
+def postings(codes, positions, weights=None):
+    """Group (code, position[, weight]) pairs CSR-style by code.
+
+    Returns (codes, offsets, positions, weights): the distinct codes in
+    ascending order, where each one's run starts, and the runs themselves,
+    positions ascending and deduplicated keeping the highest weight.
+    """
+    keys = (positions, codes) if weights is None else (-weights, positions, codes)
+    order = np.lexsort(keys)
+    codes, positions = codes[order], positions[order]
+    first = np.ones(len(codes), bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (positions[1:] != positions[:-1])
+    codes, positions = codes[first], positions[first]
+    if weights is not None:
+        weights = weights[order][first]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, np.int64)
+    offsets = np.r_[starts, len(codes)].astype(np.int32)
+    return codes[starts], offsets, positions.astype(np.int32), weights
+
+
+class _Strings:
+    """Read-only str sequence over an Arrow string array (no Python copies)."""
+
+    def __init__(self, array):
+        self._array = array
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, i):
+        return self._array[i].as_py()
+
+    def __iter__(self):
+        return iter(self._array.to_pylist())
+
+
+class _Labels:
+    """Dropdown labels, derived on access: the name, plus the NPI when the
+    name is shared with a neighbour (the roster is sorted by name)."""
+
+    def __init__(self, index):
+        self._index = index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, pos):
+        names = self._index.names
+        name = names[pos]
+        shared = (pos > 0 and names[pos - 1] == name) or (pos + 1 < len(names) and names[pos + 1] == name)
+        return f"{name} ({self._index.npis[pos]})" if shared else name
+
+    def __iter__(self):
+        return (self[pos] for pos in range(len(self)))
+
+
+class PhysicianIndex:
+    """Navigation order plus name/NPI -> position lookups over flat arrays.
+
+    Every row with an NPI gets its own entry, sorted by name then NPI, so
+    physicians who share a name are all reachable; their labels carry the
+    NPI. Rows without one are left out: profiles, caches and every other
+    index are keyed by NPI, so there would be no way to show them. The arrays
+    are Arrow/NumPy buffers: built in memory, or memory-mapped from the
+    roster file that `open_shared` writes once per store, so every Streamlit
+    process on a host shares the same pages. Lookups are binary searches.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.npis = table.column("npi").chunk(0).to_numpy(zero_copy_only=True)
+        self.names = _Strings(table.column("name").chunk(0))
+        self._npi_sorted = table.column("npi_sorted").chunk(0).to_numpy(zero_copy_only=True)
+        self._npi_order = table.column("npi_order").chunk(0).to_numpy(zero_copy_only=True)
+        self.labels = _Labels(self)
+
+    @staticmethod
+    def roster_table(store):
+        """The index columns, computed by DuckDB and returned as one Arrow batch."""
+        table = store.query(
+            f"SELECT {quote(NPI)}::BIGINT AS npi, coalesce({quote(NAME)}, 'Unknown') AS name "
+            f"FROM {TABLE} WHERE {quote(NPI)} IS NOT NULL ORDER BY name, npi"
+        ).to_arrow_table()
+        npis = table.column("npi").to_numpy()
+        order = np.argsort(npis, kind="stable").astype(np.int32)
+        table = table.append_column("npi_sorted", pa.array(npis[order]))
+        table = table.append_column("npi_order", pa.array(order))
+        return table.combine_chunks()
+
+    @classmethod
+    def from_store(cls, store):
+        return cls(cls.roster_table(store))
+
+    @classmethod
+    def open_shared(cls, store):
+        """Map the store's roster file read-only, writing it first if needed."""
+        return cls(open_shared_table(store, "roster", lambda: cls.roster_table(store)))
+
+    def __len__(self):
+        return len(self.npis)
+
+    def _name_range(self, name):
+        return bisect_left(self.names, name), bisect_right(self.names, name)
+
+    def position(self, label):
+        """Position of a dropdown label."""
+        lo, hi = self._name_range(label)
+        if hi - lo == 1:
+            return lo
+        name, _, npi = label.rpartition(" (")
+        return self.position_of_npi(int(npi.rstrip(")")))
+
+    def position_of_npi(self, npi):
+        i = int(np.searchsorted(self._npi_sorted, npi))
+        if i < len(self._npi_sorted) and self._npi_sorted[i] == npi:
+            return int(self._npi_order[i])
+        return None
+
+    def positions_of_npis(self, npis):
+        """Vectorized position_of_npi: positions for an array of NPIs, -1 if absent."""
+        i = np.searchsorted(self._npi_sorted, npis)
+        i[i == len(self._npi_sorted)] = 0
+        found = self._npi_sorted[i] == npis
+        return np.where(found, self._npi_order[i], -1)
+
+    def positions_of_name(self, name):
+        """All positions sharing `name` (more than one for duplicate names)."""
+        return list(range(*self._name_range(name)))
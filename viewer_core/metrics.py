@@ -0,0 +1,148 @@
+"""Hot-path timings and cache events, per rerun and process-wide.
+
+Phases are timed with `METRICS.timed(name)`. Each lands in a histogram for
+the process and, when it runs inside `METRICS.rerun()`, in that rerun's own
+breakdown. Every finished rerun is logged as one JSON line on the
+`viewer_core.metrics` logger. `prometheus()` renders everything in the
+Prometheus text format, and `serve(port)` exposes it at /metrics.
+"""
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger(__name__)
+
+# Histogram bounds in seconds, Prometheus style.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Latest samples kept per phase for the p50/p95 shown in the debug panel.
+RECENT_SAMPLES = 1000
+
+
+class Rerun:
+    """One rerun's breakdown: seconds per phase and counted events."""
+
+    def __init__(self):
+        self.phases = {}
+        self.events = Counter()
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._buckets = {}
+        self._sums = Counter()
+        self._counts = Counter()
+        self._recent = {}
+        self.events = Counter()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            if phase not in self._buckets:
+                self._buckets[phase] = [0] * len(BUCKETS)
+                self._recent[phase] = deque(maxlen=RECENT_SAMPLES)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    self._buckets[phase][i] += 1
+            self._sums[phase] += seconds
+            self._counts[phase] += 1
+            self._recent[phase].append(seconds)
+
+    def count(self, event, n=1):
+        with self._lock:
+            self.events[event] += n
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is not None:
+            rerun.events[event] += n
+
+    @contextmanager
+    def timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(phase, seconds)
+            rerun = getattr(self._local, "rerun", None)
+            if rerun is not None:
+                rerun.phases[phase] = rerun.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def rerun(self, **labels):
+        """Collect this thread's phases and events into one `Rerun`."""
+        rerun = self._local.rerun = Rerun()
+        start = time.perf_counter()
+        try:
+            yield rerun
+        finally:
+            self._local.rerun = None
+            rerun.phases["rerun"] = time.perf_counter() - start
+            self.observe("rerun", rerun.phases["rerun"])
+            log.info(json.dumps({
+                "event": "rerun",
+                **labels,
+                "ms": {phase: round(seconds * 1000, 3) for phase, seconds in rerun.phases.items()},
+                "events": dict(rerun.events),
+            }))
+
+    def summary(self):
+        """[(phase, count, p50 ms, p95 ms)] over the recent samples, slowest p95 first."""
+        with self._lock:
+            recent = {phase: sorted(samples) for phase, samples in self._recent.items()}
+        rows = []
+        for phase, samples in recent.items():
+            if samples:
+                p50 = samples[int(0.50 * (len(samples) - 1))]
+                p95 = samples[int(0.95 * (len(samples) - 1))]
+                rows.append((phase, self._counts[phase], p50 * 1000, p95 * 1000))
+        return sorted(rows, key=lambda r: -r[3])
+
+    def prometheus(self):
+        with self._lock:
+            lines = [
+                "# HELP viewer_phase_seconds Time spent per viewer phase.",
+                "# TYPE viewer_phase_seconds histogram",
+            ]
+            for phase, counts in sorted(self._buckets.items()):
+                for bound, n in zip(BUCKETS, counts):
+                    lines.append(f'viewer_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {n}')
+                lines.append(f'viewer_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {self._counts[phase]}')
+                lines.append(f'viewer_phase_seconds_sum{{phase="{phase}"}} {self._sums[phase]:.6f}')
+                lines.append(f'viewer_phase_seconds_count{{phase="{phase}"}} {self._counts[phase]}')
+            lines += [
+                "# HELP viewer_events_total Cache hits/misses and other counted events.",
+                "# TYPE viewer_events_total counter",
+            ]
+            lines += [f'viewer_events_total{{event="{e}"}} {n}' for e, n in sorted(self.events.items())]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port):
+        """Serve `prometheus()` at http://0.0.0.0:<port>/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+# One registry per process, shared by every session.
+METRICS = Metrics()
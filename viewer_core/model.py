@@ -0,0 +1,85 @@
+"""Compact in-memory form of the nested list entries.
+
+A decoded cell used to be a list of dicts, one per job or school, each
+holding its own copies of the employer, institution, years and source URLs.
+Cells now decode to tuples of slotted `Entry` records. There is one record
+class per key layout, so each entry costs a fixed-size object with no
+per-entry hash table. Every string value is interned, so an employer,
+institution, source domain or year shared by thousands of profiles is held
+once per process.
+
+Entries read like the dicts they replace: `entry["employer"]`,
+`entry.get("source")`, `"role" in entry` and `dict(entry)` all work.
+"""
+import sys
+from collections.abc import Mapping
+
+# Keys of each list column's entries, besides the "source" every entry cites.
+ENTRY_FIELDS = {
+    "cleaned.work_experience": ("employer", "role", "start", "end", "location", "confidence"),
+    "cleaned.residency": ("institution", "start_year", "end_year", "confidence"),
+    "cleaned.medical_school": ("institution", "start_year", "end_year", "confidence"),
+    "cleaned.emails": ("email", "type", "confidence"),
+    "cleaned.insurance_accepted": ("insurance", "confidence"),
+}
+
+
+class Entry(Mapping):
+    """Base of the generated record classes; a read-only mapping over slots."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return f"Entry({dict(self)!r})"
+
+    def __reduce__(self):
+        return entry, (dict(self),)
+
+
+_TYPES = {}
+
+
+def entry_type(keys):
+    """The record class with exactly `keys` as slots, made on first use."""
+    cls = _TYPES.get(keys)
+    if cls is None:
+        cls = _TYPES[keys] = type("Entry", (Entry,), {"__slots__": keys})
+    return cls
+
+
+def compact(value):
+    """Interned copy of a leaf value; lists become tuples."""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(compact(v) for v in value)
+    if isinstance(value, dict):
+        return entry(value)
+    return value
+
+
+def entry(d):
+    """One dict as a slotted record, or the dict itself if a key can't be a slot."""
+    keys = tuple(d)
+    if not all(isinstance(k, str) and k.isidentifier() and not hasattr(Entry, k) for k in keys):
+        return d
+    record = entry_type(keys)()
+    for key, value in d.items():
+        setattr(record, key, compact(value))
+    return record
+
+
+def entries(cell):
+    """A decoded list cell as a tuple of records (non-dict items kept as they are)."""
+    return tuple(entry(e) if isinstance(e, dict) else compact(e) for e in cell or ())
@@ -0,0 +1,82 @@
+from urllib.parse import urlparse
+
+import pandas as pd
+import pyarrow as pa
+
+from viewer_core.dataset import categorical_columns, parse_literal
+from viewer_core.model import ENTRY_FIELDS
+
+URL_COLUMNS = ["cleaned.linkedin_url.url", "cleaned.doximity_url.url"]
+
+
+def _entries(*fields):
+    return [(f, pa.string()) for f in fields] + [("source", pa.list_(pa.string()))]
+
+
+# Fixed nested types so every chunk has the same schema, whatever subset of
+# keys (or no entries at all) its rows happen to have.
+NESTED_FIELDS = {col: _entries(*fields) for col, fields in ENTRY_FIELDS.items()}
+
+
+def is_valid_url(value):
+    if not isinstance(value, str):
+        return False
+    parts = urlparse(value.strip())
+    return parts.scheme in ("http", "https") and bool(parts.netloc)
+
+
+def normalize_source(source):
+    if isinstance(source, list):
+        return [str(s) for s in source if s not in (None, "")]
+    if source in (None, ""):
+        return []
+    return [str(source)]
+
+
+def normalize_entry(entry, fields):
+    out = {}
+    for name, _ in fields:
+        if name == "source":
+            out[name] = normalize_source(entry.get("source"))
+        else:
+            value = entry.get(name)
+            out[name] = None if value is None else str(value)
+    return out
+
+
+def normalize_chunk(chunk, list_columns, decode=True):
+    """Turn a chunk of CSV rows (read with dtype=str) into a typed Arrow table.
+
+    NPI columns become int64, low-cardinality columns dictionary<int32,
+    string> and everything else string, so chunks always agree on a schema.
+    With `decode`, list columns are parsed into list<struct> with `source`
+    normalized to a list, and invalid profile URLs are blanked; without it
+    they stay literal text for lazy decoding.
+    Returns (table, {url column: number of invalid URLs blanked}).
+    """
+    invalid = {}
+    categorical = set(categorical_columns(chunk.columns))
+    arrays, fields = [], []
+    for col in chunk.columns:
+        if decode and col in list_columns:
+            entry_fields = NESTED_FIELDS.get(col)
+            values = [parse_literal(x) for x in chunk[col]]
+            if entry_fields is None:
+                array = pa.array(values)
+            else:
+                values = [[normalize_entry(e, entry_fields) for e in v if isinstance(e, dict)] for v in values]
+                array = pa.array(values, type=pa.list_(pa.struct(entry_fields)))
+        elif col.endswith("npi"):
+            array = pa.array(pd.to_numeric(chunk[col], errors="coerce").astype("Int64"), type=pa.int64(), from_pandas=True)
+        else:
+            values = chunk[col]
+            if decode and col in URL_COLUMNS:
+                valid = values.map(is_valid_url)
+                invalid[col] = int((values.notna() & ~valid).sum())
+                values = values.where(valid)
+            array = pa.array(values, type=pa.string(), from_pandas=True)
+            if col in categorical:
+                array = array.dictionary_encode()
+        arrays.append(array)
+        fields.append(pa.field(col, array.type))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields)), invalid
@@ -0,0 +1,106 @@
+"""Bulk precompute: enrichment CSV -> sharded, normalized Parquet + manifest.
+
+    python -m viewer_core.precompute v7_viewer/viewer_data.csv --workers 8
+
+Rows are read in chunks and fanned out to a process pool. Each worker parses
+the nested literals, normalizes `source` to a list of strings (v5/v6 store a
+list, v7 a single string), blanks profile URLs that are not valid http(s)
+URLs, and writes one Parquet shard. The manifest lists the shards and what
+was fixed up. The DuckDB store is then built from the shards, so the first
+viewer request finds it ready.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from viewer_core.dataset import LIST_COLUMNS, MANIFEST, precomputed_dir
+from viewer_core.normalize import normalize_chunk
+
+SHARD_ROWS = 50_000
+
+
+def process_shard(chunk, shard_path, list_columns):
+    """Normalize one chunk of CSV rows and write it as a Parquet shard."""
+    table, invalid = normalize_chunk(chunk, list_columns)
+    pq.write_table(table, shard_path)
+    return {"file": os.path.basename(shard_path), "rows": len(chunk), "invalid_urls": invalid}
+
+
+# -------------------------
+# Driver
+# -------------------------
+def precompute(csv_path, out_dir=None, list_columns=None, workers=None, shard_rows=SHARD_ROWS):
+    """Shard `csv_path` across a process pool; returns the manifest dict."""
+    out_dir = out_dir or precomputed_dir(csv_path)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        if name.endswith(".parquet") or name == MANIFEST:
+            os.remove(os.path.join(out_dir, name))
+
+    header = pd.read_csv(csv_path, nrows=0).columns
+    if list_columns is None:
+        list_columns = [c for c in LIST_COLUMNS if c in header]
+    workers = workers or os.cpu_count() or 1
+
+    started = time.time()
+    shards = []
+    chunks = pd.read_csv(csv_path, dtype=str, chunksize=shard_rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for i, chunk in enumerate(chunks):
+            shard_path = os.path.join(out_dir, f"part-{i:05d}.parquet")
+            pending.add(pool.submit(process_shard, chunk, shard_path, list_columns))
+            # Keep at most two chunks per worker in flight so memory stays bounded.
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                shards.extend(f.result() for f in done)
+        shards.extend(f.result() for f in pending)
+    shards.sort(key=lambda s: s["file"])
+
+    invalid = {}
+    for shard in shards:
+        for col, n in shard.pop("invalid_urls").items():
+            invalid[col] = invalid.get(col, 0) + n
+    manifest = {
+        "source": os.path.abspath(csv_path),
+        "source_size": os.path.getsize(csv_path),
+        "list_columns": list_columns,
+        "rows": sum(s["rows"] for s in shards),
+        "shards": shards,
+        "invalid_urls": invalid,
+        "workers": workers,
+        "seconds": round(time.time() - started, 3),
+    }
+    # Written last: a manifest means every shard it lists is complete.
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv", help="enrichment CSV to precompute")
+    parser.add_argument("--out", help="output directory (default: <csv>_precomputed/)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--shard-rows", type=int, default=SHARD_ROWS, help="rows per shard")
+    parser.add_argument("--columns", nargs="+", help="nested list columns (default: every known one present)")
+    parser.add_argument("--no-store", action="store_true", help="skip building the DuckDB store")
+    args = parser.parse_args(argv)
+
+    manifest = precompute(args.csv, args.out, args.columns, args.workers, args.shard_rows)
+    print(f"{manifest['rows']} rows -> {len(manifest['shards'])} shards in {manifest['seconds']}s")
+    if manifest["invalid_urls"]:
+        print("invalid URLs blanked:", manifest["invalid_urls"])
+    if not args.no_store and not args.out:
+        from viewer_core.store import build_store
+
+        print("store:", build_store(args.csv))
+
+
+if __name__ == "__main__":
+    main()
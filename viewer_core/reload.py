@@ -0,0 +1,56 @@
+import logging
+import os
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class Reloader:
+    """Applies a changed dataset CSV in the background.
+
+    Sessions keep using the current build meanwhile. The store takes only
+    the changed rows (`update_store`), the indexes for the new build are
+    written before anyone asks for them, and the rendered fragments of
+    physicians the update did not touch carry over to the new build.
+    A CSV that fails to apply is not retried until it changes again.
+    """
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self._threads = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def start(self, adapter):
+        """Start reloading `adapter`'s dataset unless that is already under
+        way or this version of its CSV already failed."""
+        with self._lock:
+            thread = self._threads.get(adapter.key)
+            if thread is not None and thread.is_alive():
+                return
+            mtime = os.path.getmtime(adapter.path)
+            if self._failed.get(adapter.key) == mtime:
+                return
+            thread = threading.Thread(target=self._reload, args=(adapter, mtime), name=f"reload-{adapter.key}", daemon=True)
+            self._threads[adapter.key] = thread
+            thread.start()
+
+    def running(self, key):
+        thread = self._threads.get(key)
+        return thread is not None and thread.is_alive()
+
+    def failed(self, key):
+        """Whether the latest CSV for `key` failed to apply."""
+        return key in self._failed
+
+    def _reload(self, adapter, mtime):
+        try:
+            old_version = adapter.version()
+            store = adapter.build()
+            changed = store.changed_npis()
+            if changed is not None:
+                self.fragments.carry_over(adapter.key, old_version, store.version, changed)
+            self._failed.pop(adapter.key, None)
+        except Exception:
+            log.exception("reloading %s from %s failed", adapter.key, adapter.path)
+            self._failed[adapter.key] = mtime
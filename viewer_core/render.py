@@ -0,0 +1,247 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+
+from viewer_core.metrics import METRICS
+
+# Total size of cached fragments before the least recently used are dropped.
+MAX_FRAGMENT_BYTES = 64 * 1024 * 1024
+# Profiles rendered ahead on each side of the current one, and the threads
+# (shared by every session) that render them.
+PREFETCH_DEPTH = 3
+PREFETCH_WORKERS = 4
+
+ENTRY_KEYS = ["employer", "institution", "role", "start", "start_year", "end", "end_year", "location"]
+
+SECTIONS = [
+    ("👔 Work Experience", "cleaned.work_experience"),
+    ("👨‍⚕️ Residency", "cleaned.residency"),
+    ("🎓 Medical School", "cleaned.medical_school"),
+]
+
+# Emitted once per page; the fragments only carry class names.
+PROFILE_CSS = """
+<style>
+.pv-row {
+    display: flex;
+    gap: 1rem;
+}
+.pv-col {
+    flex: 1 1 0;
+    min-width: 0;
+    overflow-wrap: anywhere;
+}
+.pv-entry {
+    margin-bottom: 0.75rem;
+}
+</style>
+"""
+
+NA = "<p>N/A</p>"
+
+
+def link(url):
+    url = escape(url)
+    return f"<a href='{url}' target='_blank'>{url}</a>"
+
+
+def source_html(src):
+    return link(src) if isinstance(src, str) and src.startswith("http") else escape(str(src))
+
+
+# -------------------------
+# Sections
+# -------------------------
+def section_html(adapter, title, items):
+    parts = [f"<h3 style='margin-top:20px;'>{title}</h3>"]
+    if not items:
+        parts.append(NA)
+    for entry in items or []:
+        lines = []
+        for key in ENTRY_KEYS:
+            if key in entry and entry[key] not in ["N/A", None, ""]:
+                pretty = key.replace("_", " ").title()
+                lines.append(f"<b>{pretty}:</b> {escape(str(entry[key]))}")
+        src = adapter.first_source(entry.get("source"))
+        if adapter.inline_sources and isinstance(src, str) and src.startswith("http"):
+            lines.append(f"<b>Source:</b> {link(src)}")
+        body = "<br>".join(lines)
+        if src and not adapter.inline_sources:
+            body += f"<ul><li>{source_html(src)}</li></ul>"
+        if body:
+            parts.append(f"<div class='pv-entry'>{body}</div>")
+    return "".join(parts)
+
+
+# -------------------------
+# Details, one column each
+# -------------------------
+def npi_html(adapter, row):
+    npi = escape(str(row["cleaned.npi"]))
+    return f"<b>NPI:</b><br><a href='https://npiregistry.cms.hhs.gov/provider-view/{npi}' target='_blank'>{npi}</a>"
+
+
+def url_html(label, url):
+    value = link(url) if isinstance(url, str) and url.startswith("http") else "N/A"
+    return f"<b>{label}:</b><br>{value}"
+
+
+def emails_html(adapter, row):
+    emails = row.get("cleaned.emails")
+    if not emails:
+        return "<b>Emails:</b><br>N/A"
+    return "<b>Emails:</b><br>" + "<br>".join(escape(str(e.get("email", "N/A"))) for e in emails)
+
+
+def insurance_html(adapter, row):
+    ins = row.get("cleaned.insurance_accepted")
+    if not ins:
+        return "<b>Insurance:</b><br>N/A"
+    parts = ["<b>Insurance:</b>"]
+    for i in ins:
+        item = escape(str(i.get("insurance", "N/A")))
+        src = adapter.first_source(i.get("source"))
+        if src:
+            item += f"<ul><li>{source_html(src)}</li></ul>"
+        parts.append(f"<div class='pv-entry'>{item}</div>")
+    return "".join(parts)
+
+
+def license_state_html(adapter, row):
+    return f"<b>License State:</b><br>{escape(str(row.get('license_state')))}"
+
+
+DETAILS = {
+    "npi": npi_html,
+    "doximity": lambda adapter, row: url_html("Doximity", row.get("cleaned.doximity_url.url")),
+    "linkedin": lambda adapter, row: url_html("LinkedIn", row.get("cleaned.linkedin_url.url")),
+    "emails": emails_html,
+    "insurance": insurance_html,
+    "license_state": license_state_html,
+}
+
+
+def profile_html(adapter, row):
+    """The whole profile (name, three sections, Details) as one HTML fragment."""
+    with METRICS.timed("sections"):
+        sections = "".join(
+            f"<div class='pv-col'>{section_html(adapter, title, row[col])}</div>" for title, col in SECTIONS
+        )
+    with METRICS.timed("details"):
+        details = "".join(f"<div class='pv-col'>{DETAILS[d](adapter, row)}</div>" for d in adapter.details)
+    return (
+        f"<h2 style='margin-top:10px;'>{escape(str(row['cleaned.name']))}</h2>"
+        f"<div class='pv-row'>{sections}</div>"
+        "<h2 style='margin-top:35px;'>Details</h2>"
+        f"<div class='pv-row'>{details}</div>"
+    )
+
+
+# -------------------------
+# Cross-session fragment cache
+# -------------------------
+class FragmentCache:
+    """LRU of rendered fragments, evicted by total size rather than count."""
+
+    def __init__(self, max_bytes=MAX_FRAGMENT_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._items[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes and len(self._items) > 1:
+                _, dropped = self._items.popitem(last=False)
+                self.size -= len(dropped)
+
+    def carry_over(self, dataset, old_version, new_version, changed):
+        """Re-key `dataset`'s fragments from one store build to the next,
+        except those of the `changed` NPIs."""
+        changed = set(int(npi) for npi in changed)
+        with self._lock:
+            moved = [
+                ((d, new_version, npi), value)
+                for (d, version, npi), value in self._items.items()
+                if d == dataset and version == old_version and npi not in changed
+            ]
+            for key, value in moved:
+                if key not in self._items:
+                    self._items[key] = value
+                    self.size += len(value)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+def cached_profile_html(cache, adapter, store, npi):
+    """Fragment for `npi`, rendering (and fetching) it only on a cache miss."""
+    key = (adapter.key, store.version, npi)
+    fragment = cache.get(key)
+    if fragment is None:
+        METRICS.count("fragment_cache_miss")
+        with METRICS.timed("fetch"):
+            row = store.fetch(npi=npi)
+        fragment = profile_html(adapter, row)
+        cache.put(key, fragment)
+    else:
+        METRICS.count("fragment_cache_hit")
+    return fragment
+
+
+# -------------------------
+# Neighbour prefetch
+# -------------------------
+class Prefetcher:
+    """Renders profiles into a FragmentCache on a thread pool ahead of need.
+
+    A key is rendered at most once at a time: asking for one that is still
+    in flight waits on that render instead of starting another.
+    """
+
+    def __init__(self, cache, workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, adapter, store, npis):
+        """Queue renders for any of `npis` not already cached or in flight."""
+        for npi in npis:
+            key = (adapter.key, store.version, npi)
+            with self._lock:
+                if key in self._pending or key in self.cache:
+                    continue
+                self._pending[key] = self._pool.submit(self._render, key, adapter, store, npi)
+
+    def _render(self, key, adapter, store, npi):
+        try:
+            return cached_profile_html(self.cache, adapter, store, npi)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def profile_html(self, adapter, store, npi):
+        """Fragment for `npi`, from the cache, an in-flight prefetch, or rendered now."""
+        with self._lock:
+            future = self._pending.get((adapter.key, store.version, npi))
+        if future is not None:
+            return future.result()
+        return cached_profile_html(self.cache, adapter, store, npi)
@@ -0,0 +1,152 @@
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+
+from viewer_core.store import NPI, TABLE, quote
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Columns searched besides name and NPI, when the dataset has them (v7 does).
+LOCATION_COLUMNS = ["city", "state"]
+
+# Score per match: field weight x match kind.
+NAME_WEIGHT, NPI_WEIGHT, LOCATION_WEIGHT = 2, 2, 1
+EXACT, PREFIX, INFIX = 3, 2, 1
+
+_EMPTY = np.empty(0, np.int32)
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower()) if isinstance(text, str) else []
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class _TokenIndex:
+    """Token -> positions, stored CSR-style in sorted-vocabulary order.
+
+    Because postings are laid out in vocabulary order, every token sharing a
+    prefix is one contiguous slice of `positions`. Infix matches go through
+    a trigram map over the (much smaller) vocabulary rather than the rows.
+    """
+
+    def __init__(self, docs, infix=True):
+        postings = defaultdict(list)
+        for pos, text in docs:
+            for tok in set(tokenize(text)):
+                postings[tok].append(pos)
+        self.vocab = sorted(postings)
+        sizes = [len(postings[t]) for t in self.vocab]
+        self.offsets = np.zeros(len(self.vocab) + 1, np.int64)
+        np.cumsum(sizes, out=self.offsets[1:])
+        self.positions = np.fromiter(
+            chain.from_iterable(postings[t] for t in self.vocab), np.int32, int(self.offsets[-1])
+        )
+        self.grams = None
+        if infix:
+            grams = defaultdict(list)
+            for tid, tok in enumerate(self.vocab):
+                for g in trigrams(tok):
+                    grams[g].append(tid)
+            self.grams = {g: np.array(ids, np.int32) for g, ids in grams.items()}
+
+    def _slice(self, lo, hi):
+        return self.positions[self.offsets[lo]:self.offsets[hi]]
+
+    def match(self, term):
+        """[(positions, kind)] for exact, prefix and infix hits on `term`."""
+        lo = bisect_left(self.vocab, term)
+        hi = bisect_left(self.vocab, term + "\uffff", lo)
+        hits = []
+        if lo < hi and self.vocab[lo] == term:
+            hits.append((self._slice(lo, lo + 1), EXACT))
+            lo += 1
+        if lo < hi:
+            hits.append((self._slice(lo, hi), PREFIX))
+        if self.grams is not None and len(term) >= 3:
+            ids = None
+            for g in trigrams(term):
+                ids = self.grams.get(g, _EMPTY) if ids is None else np.intersect1d(ids, self.grams.get(g, _EMPTY))
+            infix = [i for i in ids if term in self.vocab[i] and not self.vocab[i].startswith(term)]
+            if infix:
+                hits.append((np.concatenate([self._slice(i, i + 1) for i in infix]), INFIX))
+        return hits
+
+
+class SearchIndex:
+    """Ranked typeahead over name, NPI and (where present) city/state.
+
+    Every query term has to match some field; matches are ranked by score,
+    then by navigation order. Positions are those of `PhysicianIndex`.
+    """
+
+    def __init__(self, names, npis, locations=None):
+        self._size = len(names)
+        self._fields = [
+            (_TokenIndex(enumerate(names)), NAME_WEIGHT),
+            (_TokenIndex(((p, str(n)) for p, n in enumerate(npis) if n), infix=False), NPI_WEIGHT),
+        ]
+        if locations:
+            self._fields.append((_TokenIndex(locations.items()), LOCATION_WEIGHT))
+
+    @classmethod
+    def from_store(cls, store, index):
+        locations = None
+        cols = [c for c in LOCATION_COLUMNS if c in store.columns]
+        if cols:
+            select = ", ".join(quote(c) for c in [NPI] + cols)
+            locations = {}
+            rows = store.query(f"SELECT {select} FROM {TABLE} WHERE {quote(NPI)} IS NOT NULL").fetchall()
+            for npi, *values in rows:
+                pos = index.position_of_npi(npi)
+                if pos is not None:
+                    locations[pos] = " ".join(v for v in values if isinstance(v, str))
+        return cls(index.names, index.npis, locations)
+
+    def _term_scores(self, term):
+        positions, scores = [], []
+        for field, weight in self._fields:
+            for hit, kind in field.match(term):
+                positions.append(hit)
+                scores.append(np.full(len(hit), weight * kind, np.int32))
+        if not positions:
+            return _EMPTY, _EMPTY
+        positions = np.concatenate(positions)
+        scores = np.concatenate(scores)
+        # Keep the best score per position.
+        order = np.lexsort((-scores, positions))
+        positions, scores = positions[order], scores[order]
+        first = np.ones(len(positions), bool)
+        first[1:] = positions[1:] != positions[:-1]
+        return positions[first], scores[first]
+
+    def search(self, query, limit=25, within=None):
+        """Top `limit` positions matching every term of `query`.
+
+        `within`, a sorted array of positions (e.g. a facet filter), restricts
+        the matches before ranking.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        positions, scores = self._term_scores(terms[0])
+        for term in terms[1:]:
+            more, more_scores = self._term_scores(term)
+            positions, i, j = np.intersect1d(positions, more, assume_unique=True, return_indices=True)
+            scores = scores[i] + more_scores[j]
+        if within is not None:
+            keep = np.isin(positions, within, assume_unique=True)
+            positions, scores = positions[keep], scores[keep]
+        # One sortable key: higher score first, then navigation order. The
+        # argpartition keeps this O(matches) ahead of the small final sort.
+        key = scores.astype(np.int64) * (self._size + 1) - positions
+        if len(key) > limit:
+            keep = np.argpartition(-key, limit - 1)[:limit]
+            positions, key = positions[keep], key[keep]
+        order = np.argsort(-key, kind="stable")
+        return positions[order].tolist()
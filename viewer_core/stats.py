@@ -0,0 +1,105 @@
+import pyarrow as pa
+
+from viewer_core.facets import MISSING
+from viewer_core.index import open_shared_table
+from viewer_core.store import TABLE, quote
+
+# Profile counts per value: (key, label, column, field inside its entries;
+# None for a flat column). Flat columns keep every value, entry fields their
+# STATS_TOP most common.
+RANKED = [
+    ("license_state", "License State", "license_state", None),
+    ("state", "State", "state", None),
+    ("years_confidence", "Years Experience Confidence", "cleaned.years_experience.confidence", None),
+    ("employer", "Top Employers", "cleaned.work_experience", "employer"),
+    ("residency", "Top Residency Programs", "cleaned.residency", "institution"),
+    ("medical_school", "Top Medical Schools", "cleaned.medical_school", "institution"),
+]
+STATS_TOP = 25
+# Part of the stats file's version: bump it when the aggregates change, so
+# files written by older code are rebuilt rather than served.
+STATS_FORMAT = 2
+
+YEARS = "cleaned.years_experience.value"
+# Width of the years-of-experience histogram buckets.
+YEARS_BUCKET = 5
+
+# Profile URLs whose coverage is reported: (key, label, column).
+COVERAGE = [
+    ("linkedin", "LinkedIn", "cleaned.linkedin_url.url"),
+    ("doximity", "Doximity", "cleaned.doximity_url.url"),
+]
+
+_MISSING_SQL = ", ".join("'" + m + "'" for m in MISSING)
+
+
+class DatasetStats:
+    """Dashboard aggregates for one store build.
+
+    Computed with DuckDB group-bys when the store is built and kept as one
+    small (stat, value, count) table, memory-mapped like the indexes, so the
+    dashboard never aggregates profiles on a rerun.
+    """
+
+    def __init__(self, table):
+        rows = table.to_pylist()
+        self._stats = {}
+        for row in rows:
+            self._stats.setdefault(row["stat"], []).append((row["value"], row["count"]))
+        self.total = dict(self._stats.pop("total", [("", 0)]))[""]
+        self.years = self._stats.pop("years", [])
+        covered = dict(self._stats.pop("coverage", []))
+        self.coverage = [(label, covered[key]) for key, label, _ in COVERAGE if key in covered]
+        self.ranked = [(key, label, self._stats[key]) for key, label, _, _ in RANKED if key in self._stats]
+
+    @staticmethod
+    def build_table(store):
+        parts = [("total", f"SELECT '' AS value, count(*) AS count FROM {TABLE}")]
+        for key, _, column, field in RANKED:
+            if column not in store.columns:
+                continue
+            if field is None:
+                value = f"trim({quote(column)}::VARCHAR)"
+                source = f"SELECT {value} AS value FROM {TABLE}"
+                limit = ""
+            else:
+                # Each profile counts once per value, however many entries repeat it.
+                source = f"SELECT trim(unnest(list_distinct({store.field_values(column, field)}))::VARCHAR) AS value FROM {TABLE}"
+                limit = f"LIMIT {STATS_TOP}"
+            parts.append((key, (
+                f"SELECT value, count(*) AS count FROM ({source}) "
+                f"WHERE value IS NOT NULL AND value NOT IN ({_MISSING_SQL}) "
+                f"GROUP BY value ORDER BY count DESC, value {limit}"
+            )))
+        if YEARS in store.columns:
+            # Values read "20", "19+ years" or "over 10 years": bucket by the first number.
+            number = f"TRY_CAST(regexp_extract({quote(YEARS)}::VARCHAR, '\\d+(\\.\\d+)?') AS DOUBLE)"
+            years = f"floor({number} / {YEARS_BUCKET})::INTEGER * {YEARS_BUCKET}"
+            parts.append(("years", (
+                f"SELECT coalesce(bucket || '–' || (bucket + {YEARS_BUCKET - 1}), 'Unknown') AS value, count FROM "
+                f"(SELECT {years} AS bucket, count(*) AS count FROM {TABLE} GROUP BY bucket) "
+                f"ORDER BY bucket NULLS LAST"
+            )))
+        covered = [
+            f"SELECT '{key}' AS value, count(*) FILTER (WHERE regexp_matches({quote(column)}::VARCHAR, '^https?://')) AS count FROM {TABLE}"
+            for key, _, column in COVERAGE if column in store.columns
+        ]
+        if covered:
+            parts.append(("coverage", " UNION ALL ".join(covered)))
+
+        stats, values, counts = [], [], []
+        for stat, sql in parts:
+            result = store.query(sql).fetchall()
+            stats += [stat] * len(result)
+            values += [value for value, _ in result]
+            counts += [count for _, count in result]
+        return pa.table({
+            "stat": pa.array(stats, pa.string()),
+            "value": pa.array(values, pa.string()),
+            "count": pa.array(counts, pa.int64()),
+        })
+
+    @classmethod
+    def open_shared(cls, store):
+        version = f"{store.version}:{STATS_FORMAT}"
+        return cls(open_shared_table(store, "stats", lambda: cls.build_table(store), version))
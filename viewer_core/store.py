@@ -0,0 +1,433 @@
+import hashlib
+import itertools
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from viewer_core.dataset import (
+    LIST_COLUMNS,
+    MANIFEST,
+    columnar_path,
+    decode_cached,
+    fresh_manifest,
+    precomputed_dir,
+)
+from viewer_core.model import entries
+from viewer_core.normalize import normalize_chunk
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are only serialized within a process.
+    fcntl = None
+
+TABLE = "physicians"
+NPI = "cleaned.npi"
+NAME = "cleaned.name"
+# Content hash of each row's CSV text, kept on stores ingested from CSV so a
+# changed file can be applied as a delta. Not one of the profile's columns.
+ROW_HASH = "_row_hash"
+# NPIs touched by the last incremental update, relative to the build before.
+DELTA = "changed_npis"
+
+
+def store_path(csv_path):
+    """Where the DuckDB store built from `csv_path` lives."""
+    return os.path.splitext(csv_path)[0] + ".duckdb"
+
+
+def store_version(db_path):
+    """Identifies one build of a store file; caches of derived data key on it."""
+    stat = os.stat(db_path)
+    return hashlib.sha1(f"{db_path}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()[:12]
+
+
+def quote(col):
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _is_stale(target, *sources):
+    if not os.path.exists(target):
+        return True
+    mtime = os.path.getmtime(target)
+    return any(os.path.exists(s) and os.path.getmtime(s) > mtime for s in sources)
+
+
+# -------------------------
+# Build
+# -------------------------
+# Rows per CSV chunk on the streaming ingest path; peak memory follows this,
+# not the file size.
+CHUNK_ROWS = 20_000
+# DuckDB's own cap while building; it spills to disk beyond this.
+BUILD_MEMORY_LIMIT = "256MB"
+
+# One build per target file at a time: a thread lock per file within the
+# process, plus an flock on `<db>.lock` across processes.
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+# Suffixes for the NPI lists stream() registers, unique within the process.
+_cohort_ids = itertools.count()
+
+
+def needs_build(csv_path):
+    """True if the store for `csv_path` is missing or older than its sources."""
+    manifest = os.path.join(precomputed_dir(csv_path), MANIFEST)
+    return _is_stale(store_path(csv_path), csv_path, columnar_path(csv_path), manifest)
+
+
+def _read_chunks(con, csv_path, progress):
+    """CSV chunks (every value as text), each with its rows' content hashes."""
+    total = os.path.getsize(csv_path) or 1
+    with open(csv_path, "rb") as f:
+        for chunk in pd.read_csv(f, dtype=str, chunksize=CHUNK_ROWS):
+            # DuckDB hashes the whole row natively, far faster than pandas.
+            con.register("raw", pa.Table.from_pandas(chunk, preserve_index=False))
+            hashes = con.execute("SELECT hash(raw) AS h FROM raw").fetchnumpy()["h"]
+            con.unregister("raw")
+            yield chunk, hashes
+            if progress:
+                progress(min(f.tell() / total, 1.0))
+
+
+def _insert_chunk(con, chunk, hashes, list_columns, decode, create=False):
+    table, _ = normalize_chunk(chunk, list_columns, decode=decode)
+    table = table.append_column(ROW_HASH, pa.array(hashes, pa.uint64()))
+    con.register("chunk", table)
+    if create:
+        con.execute(f"CREATE TABLE {TABLE} AS SELECT * FROM chunk")
+    else:
+        con.execute(f"INSERT INTO {TABLE} SELECT * FROM chunk")
+    con.unregister("chunk")
+
+
+def _ingest_csv(con, csv_path, list_columns, decode, progress):
+    """Stream `csv_path` into the table chunk by chunk, releasing each one."""
+    for i, (chunk, hashes) in enumerate(_read_chunks(con, csv_path, progress)):
+        _insert_chunk(con, chunk, hashes, list_columns, decode, create=i == 0)
+        del chunk, hashes
+
+
+def _apply_delta(con, csv_path, list_columns, decode, progress):
+    """Bring the table in line with `csv_path`, touching only rows that changed.
+
+    Rows are matched by content hash: rows whose hash the table lacks are
+    normalized and inserted, stored rows whose hash the CSV lacks are
+    deleted, and the NPIs of both are recorded in the DELTA table. Copies
+    of an identical row count as one content, so duplicates already stored
+    are neither added nor removed.
+    """
+    stored = np.sort(con.execute(f"SELECT {quote(ROW_HASH)} FROM {TABLE}").fetchnumpy()[ROW_HASH])
+    seen, changed = [], []
+    for chunk, hashes in _read_chunks(con, csv_path, progress):
+        seen.append(hashes)
+        i = np.searchsorted(stored, hashes)
+        i[i == len(stored)] = 0
+        new = stored[i] != hashes if len(stored) else np.ones(len(hashes), bool)
+        if new.any():
+            _insert_chunk(con, chunk[new], hashes[new], list_columns, decode)
+            changed.append(pd.to_numeric(chunk[NPI][new], errors="coerce").dropna().astype("int64").to_numpy())
+        del chunk, hashes
+
+    con.register("seen", pa.table({"h": np.concatenate(seen) if seen else np.empty(0, np.uint64)}))
+    gone = f"FROM {TABLE} WHERE {quote(ROW_HASH)} NOT IN (SELECT h FROM seen)"
+    changed.append(con.execute(f"SELECT {quote(NPI)} {gone} AND {quote(NPI)} IS NOT NULL").fetchnumpy()[NPI])
+    con.execute(f"DELETE {gone}")
+    con.unregister("seen")
+    con.register("changed", pa.table({"npi": np.unique(np.concatenate(changed).astype(np.int64))}))
+    con.execute(f"CREATE OR REPLACE TABLE {DELTA} AS SELECT npi FROM changed")
+    con.unregister("changed")
+
+
+def build_store(csv_path, db_path=None, list_columns=None, decode=False, progress=None):
+    """Ingest `csv_path` into an indexed DuckDB file.
+
+    The freshest pre-parsed form wins: precomputed shards (viewer_core.precompute),
+    then the .parquet copy (viewer_core.convert), both loaded by DuckDB
+    directly. Otherwise the CSV is streamed in CHUNK_ROWS chunks; list columns
+    stay literal text for `PhysicianStore` to decode per fetched row unless
+    `decode` is set. `progress(fraction)` is called as the CSV is consumed.
+    """
+    db_path = db_path or store_path(csv_path)
+    with _build_lock(db_path):
+        return _build_store(csv_path, db_path, list_columns, decode, progress)
+
+
+def ensure_store(csv_path, list_columns=None, progress=None):
+    """Build the store for `csv_path` unless an up-to-date one already exists.
+
+    The check is repeated under the build lock, so sessions that arrive
+    during a cold load wait for it instead of starting another build. A
+    store ingested from an earlier version of the same CSV is updated in
+    place of a rebuild (see `update_store`).
+    """
+    db_path = store_path(csv_path)
+    with _build_lock(db_path):
+        if needs_build(csv_path):
+            if not update_store(csv_path, db_path, list_columns, progress):
+                _build_store(csv_path, db_path, list_columns, False, progress)
+    return db_path
+
+
+def update_store(csv_path, db_path, list_columns=None, progress=None):
+    """Apply a changed `csv_path` to its existing store as a row delta.
+
+    Works on a copy that is swapped in when done, so readers keep the old
+    build meanwhile. Returns False, leaving everything as it was, when the
+    store cannot take a delta: it is missing, came from Parquet (no row
+    hashes), its columns differ from the CSV's, or a fresher precomputed
+    source should be loaded instead.
+    """
+    if not os.path.exists(db_path) or fresh_manifest(csv_path):
+        return False
+    parquet = columnar_path(csv_path)
+    if os.path.exists(parquet) and not _is_stale(parquet, csv_path):
+        return False
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    if list_columns is None:
+        list_columns = [c for c in LIST_COLUMNS if c in header]
+
+    tmp = db_path + ".tmp"
+    shutil.copyfile(db_path, tmp)
+    con = duckdb.connect(tmp, config={"memory_limit": BUILD_MEMORY_LIMIT})
+    try:
+        types = {r[0]: r[1] for r in con.execute(f"DESCRIBE {TABLE}").fetchall()}
+        compatible = list(types) == header + [ROW_HASH]
+        if compatible:
+            # New rows must match how the existing ones were ingested.
+            decode = any(types[c] != "VARCHAR" for c in list_columns if c in types)
+            _apply_delta(con, csv_path, list_columns, decode, progress)
+            con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    if not compatible:
+        os.remove(tmp)
+        return False
+    if progress:
+        progress(1.0)
+    os.replace(tmp, db_path)
+    return True
+
+
+@contextmanager
+def _build_lock(db_path):
+    """Hold `db_path`'s build lock, so concurrent sessions and the other
+    server processes on the host wait for one build instead of racing on
+    its temp file."""
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(os.path.abspath(db_path), threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(db_path + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _build_store(csv_path, db_path, list_columns, decode, progress):
+    parquet = columnar_path(csv_path)
+    manifest = fresh_manifest(csv_path)
+    if manifest:
+        source_path = os.path.join(os.path.dirname(manifest), "*.parquet")
+    elif os.path.exists(parquet) and not _is_stale(parquet, csv_path):
+        source_path = parquet
+    else:
+        source_path = None
+        if list_columns is None:
+            header = pd.read_csv(csv_path, nrows=0).columns
+            list_columns = [c for c in LIST_COLUMNS if c in header]
+
+    tmp = db_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = duckdb.connect(tmp, config={"memory_limit": BUILD_MEMORY_LIMIT})
+    try:
+        if source_path:
+            con.execute(f"CREATE TABLE {TABLE} AS SELECT * FROM read_parquet(?)", [source_path])
+        else:
+            _ingest_csv(con, csv_path, list_columns, decode, progress)
+        con.execute(f"CREATE INDEX idx_npi ON {TABLE} ({quote(NPI)})")
+        con.execute(f"CREATE INDEX idx_name ON {TABLE} ({quote(NAME)})")
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    if progress:
+        progress(1.0)
+    # Swap in atomically so a concurrent reader never sees a half-built file.
+    os.replace(tmp, db_path)
+    return db_path
+
+
+# -------------------------
+# Read
+# -------------------------
+class PhysicianStore:
+    """Read-only point lookups against a DuckDB store.
+
+    The connection is shared; each thread (Streamlit session) gets its own
+    cursor, and DuckDB pages data in from disk as queries need it. The file
+    is ATTACHed to a private in-memory database rather than opened by path,
+    because DuckDB shares one instance per path within a process and would
+    keep serving the old build after an update swaps the file.
+    """
+
+    def __init__(self, db_path, list_columns, memory_limit=None):
+        config = {"memory_limit": memory_limit} if memory_limit else {}
+        self.db_path = db_path
+        self.version = store_version(db_path)
+        self.list_columns = list_columns
+        self._con = duckdb.connect(config=config)
+        path = db_path.replace("'", "''")
+        self._con.execute(f"ATTACH '{path}' AS store (READ_ONLY)")
+        self._con.execute("USE store")
+        self._local = threading.local()
+        schema = self._con.execute(f"DESCRIBE {TABLE}").fetchall()
+        self.columns = [r[0] for r in schema if r[0] != ROW_HASH]
+        self._types = types = {r[0]: r[1] for r in schema}
+        # Only columns ingested as text need decoding on the way out.
+        self._text_lists = {c for c in list_columns if types.get(c) == "VARCHAR"}
+        self._lists = {c for c in list_columns if c in types}
+        # Entry fields each list<struct> column actually stores; a store
+        # converted from an older copy may lack some (v7's confidence).
+        arrow = self._con.execute(f"SELECT * FROM {TABLE} LIMIT 0").to_arrow_table().schema
+        self._entry_fields = {
+            f.name: {e.name for e in f.type.value_type}
+            for f in arrow
+            if pa.types.is_list(f.type) and pa.types.is_struct(f.type.value_type)
+        }
+
+    @classmethod
+    def open(cls, csv_path, list_columns, **kwargs):
+        """Open the store for `csv_path`, (re)building it if the data is newer."""
+        return cls(ensure_store(csv_path, list_columns), list_columns, **kwargs)
+
+    def _cursor(self):
+        cur = getattr(self._local, "cursor", None)
+        if cur is None:
+            cur = self._local.cursor = self._con.cursor()
+            cur.execute("USE store")
+        return cur
+
+    def query(self, sql, params=None):
+        return self._cursor().execute(sql, params or [])
+
+    def column_type(self, column):
+        """DuckDB type of `column` as text (e.g. "VARCHAR", "DOUBLE"), or None
+        if the store has no such column."""
+        return self._types.get(column)
+
+    def _row(self, cols, values):
+        row = dict(zip(cols, values))
+        for col in self._lists.intersection(cols):
+            row[col] = decode_cached(row[col]) if col in self._text_lists else entries(row[col])
+        return row
+
+    def fetch(self, npi=None, name=None, columns=None):
+        """Return one profile as a dict, looked up by NPI or by name, or None."""
+        if npi is not None:
+            key, value = NPI, npi
+        elif name is not None:
+            key, value = NAME, name
+        else:
+            raise ValueError("fetch() needs npi or name")
+        cols = columns or self.columns
+        select = ", ".join(quote(c) for c in cols)
+        values = self.query(
+            f"SELECT {select} FROM {TABLE} WHERE {quote(key)} = ? LIMIT 1",
+            [value],
+        ).fetchone()
+        return None if values is None else self._row(cols, values)
+
+    def fetch_many(self, npis, columns=None):
+        """Profiles for `npis` as dicts, in the order given (None where missing)."""
+        cols = columns or self.columns
+        select = ", ".join(quote(c) for c in [NPI] + cols)
+        rows = self.query(
+            f"SELECT {select} FROM {TABLE} WHERE {quote(NPI)} IN (SELECT unnest(?))",
+            [list(npis)],
+        ).fetchall()
+        found = {values[0]: self._row(cols, values[1:]) for values in rows}
+        return [found.get(npi) for npi in npis]
+
+    def nested_values(self, column, field):
+        """Arrow table of (npi, value): `field` of every entry in list column `column`.
+
+        Typed columns are unnested in SQL. Columns kept as literal text are
+        matched with a regex rather than parsed row by row.
+        """
+        values = self.field_values(column, field)
+        return self.query(
+            f"SELECT {quote(NPI)} AS npi, unnest({values}) AS value FROM {TABLE}"
+        ).to_arrow_table()
+
+    def field_values(self, column, field):
+        """SQL expression for the list of `field` values of a row's entries in
+        list column `column` (or in a raw.* column holding list text), in
+        entry order.
+
+        Text cells are JSON or Python repr, which quotes with ' unless the
+        value itself contains one, hence the two string alternatives; the
+        quotes are sliced off the match, and "-quoted values are read as JSON
+        strings so escapes like \\u2011 are decoded. Unquoted values (None,
+        null, numbers, booleans) are matched too, as NULL or their text, so
+        two fields' lists over the same entries stay aligned. A field the
+        entries' struct does not have comes back as NULL for every entry.
+        """
+        col = quote(column)
+        if self._types.get(column) == "VARCHAR":
+            strings = r"'(?:[^'\\]|\\.)*'" + "|" + r'"(?:[^"\\]|\\.)*"'
+            bare = r"None|null|True|False|true|false|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?"
+            pattern = f"""['"]{field}['"]: ({strings}|{bare})""".replace("'", "''")
+            value = (
+                "CASE WHEN v IN ('None', 'null') THEN NULL "
+                """WHEN v[1] = '"' AND json_valid(v) THEN json_extract_string(v, '$') """
+                """WHEN v[1] IN ('''', '"') THEN v[2:-2] ELSE v END"""
+            )
+            return f"list_transform(regexp_extract_all({col}, '{pattern}', 1), lambda v: {value})"
+        if field not in self._entry_fields.get(column, ()):
+            return f"list_transform({col}, lambda e: NULL::VARCHAR)"
+        return f"list_transform({col}, lambda e: struct_extract(e, '{field}'))"
+
+    def stream(self, npis, select, chunk_rows, progress=None):
+        """Arrow record batches of the SQL `select` list over the rows for
+        `npis`, in that order and `chunk_rows` NPIs per query, so memory is
+        bounded by one chunk. Missing NPIs are skipped. Always yields at
+        least one (possibly empty) batch, which carries the schema.
+        """
+        for start in range(0, max(len(npis), 1), chunk_rows):
+            part = pa.table({"_npi": pa.array(npis[start:start + chunk_rows], pa.int64())})
+            part = part.append_column("_ord", pa.array(np.arange(len(part), dtype=np.int64)))
+            # A consumer may resume the generator on another thread (the
+            # API's streamed responses do), so take that thread's cursor for
+            # each chunk, and a name no concurrent stream is using.
+            cur = self._cursor()
+            name = f"cohort_{next(_cohort_ids)}"
+            cur.register(name, part)
+            try:
+                table = cur.execute(
+                    f"SELECT {select} FROM {name} JOIN {TABLE} ON {quote(NPI)} = _npi ORDER BY _ord"
+                ).to_arrow_table()
+            finally:
+                cur.unregister(name)
+            yield from table.to_batches() or [pa.RecordBatch.from_pylist([], schema=table.schema)]
+            if progress:
+                progress(min((start + chunk_rows) / max(len(npis), 1), 1.0))
+
+    def changed_npis(self):
+        """NPIs the last incremental update touched, or None after a full build."""
+        tables = {r[0] for r in self.query("SHOW TABLES").fetchall()}
+        if DELTA not in tables:
+            return None
+        return self.query(f"SELECT npi FROM {DELTA}").fetchnumpy()["npi"]
+
+    def count(self):
+        return self.query(f"SELECT count(*) FROM {TABLE}").fetchone()[0]
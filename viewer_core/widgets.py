@@ -0,0 +1,341 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Above this many physicians the viewers default to search mode, since a
+# selectbox ships every option to the browser on each rerun.
+MAX_DROPDOWN_OPTIONS = 5000
+SEARCH_LIMIT = 25
+# Values offered per facet, most common first. A facet with more gets a box
+# that searches all of its values.
+FACET_OPTION_LIMIT = 500
+FACET_KEY_PREFIX = "facet_"
+PAGE_SIZES = [25, 50, 100, 200]
+# Rows listed in the compare view; the count above it covers them all.
+COMPARE_ROWS = 1000
+# Most profiles the sidebar exports: Streamlit holds a download in memory,
+# so larger cohorts go through the API's streamed batch endpoint instead.
+EXPORT_LIMIT = 50_000
+
+
+def step(current, delta, size, filtered=None):
+    """Position `delta` steps from `current`, stopping at either end.
+
+    With `filtered` (sorted positions containing `current`), steps through
+    that set instead of the whole roster.
+    """
+    if filtered is None:
+        return min(max(current + delta, 0), size - 1)
+    i = int(np.searchsorted(filtered, current)) + delta
+    return int(filtered[min(max(i, 0), len(filtered) - 1)])
+
+
+def facet_filters(facets, limit=FACET_OPTION_LIMIT):
+    """Sidebar multiselect per facet; returns {facet: [values]} as picked.
+
+    Facets with more than `limit` values get a find box: the multiselect
+    then offers the matching values (plus those already picked) instead of
+    only the most common ones.
+    """
+    selection = {}
+    st.sidebar.markdown("**Filters**")
+    for facet, label in facets.facets:
+        query = None
+        if facets.size(facet) > limit:
+            query = st.sidebar.text_input(f"Find {label}:", key=f"{FACET_KEY_PREFIX}find_{facet}")
+        counts = dict(facets.options(facet, limit, query))
+        for value in st.session_state.get(FACET_KEY_PREFIX + facet, []):
+            counts.setdefault(value, facets.count(facet, value))
+        selection[facet] = st.sidebar.multiselect(
+            label,
+            list(counts),
+            format_func=lambda value, counts=counts: f"{value} ({counts[value]})",
+            key=FACET_KEY_PREFIX + facet,
+        )
+    return selection
+
+
+def search_picker(index, search, limit=SEARCH_LIMIT, within=None, label="Search Physician (name, NPI, city, state):"):
+    """Typeahead picker: the server ranks matches and sends at most `limit`.
+
+    Writes the chosen position to st.session_state.selected_index, the same
+    state the dropdown and Prev/Next buttons drive. `within` restricts both
+    matches and the browse window to a filtered set of positions.
+    """
+    query = st.text_input(label, key="search_query")
+    current = st.session_state.selected_index
+    if query:
+        options = search.search(query, limit, within=within)
+    elif within is None:
+        # Nothing typed yet: offer a window starting at the current physician.
+        options = list(range(current, min(len(index), current + limit)))
+    else:
+        start = int(np.searchsorted(within, current))
+        options = within[start:start + limit].tolist()
+
+    def choose():
+        pos = st.session_state.search_choice
+        if pos is not None:
+            st.session_state.selected_index = pos
+
+    st.selectbox(
+        f"Matches ({len(options)} shown):",
+        options,
+        index=options.index(current) if current in options else None,
+        format_func=lambda pos: index.labels[pos],
+        placeholder="No match selected" if options else "No matches",
+        key="search_choice",
+        on_change=choose,
+    )
+
+
+def browse_table(fetch_page, total, filtered=None):
+    """One page of the roster (or of `filtered`) as a table.
+
+    `fetch_page(positions)` builds the page's DataFrame, so only the visible
+    rows are read and sent. Picking a row opens that profile.
+    """
+    col_size, col_page, col_info = st.columns([0.2, 0.2, 0.6])
+    size = col_size.selectbox("Rows per page:", PAGE_SIZES, key="browse_size")
+    count = total if filtered is None else len(filtered)
+    pages = max(1, -(-count // size))
+    if st.session_state.get("browse_page", 1) > pages:
+        st.session_state.browse_page = pages
+    page = col_page.number_input("Page:", min_value=1, max_value=pages, key="browse_page")
+    start = (page - 1) * size
+    if filtered is None:
+        positions = list(range(start, min(count, start + size)))
+    else:
+        positions = filtered[start:start + size].tolist()
+    col_info.caption(f"Rows {start + 1:,}–{start + len(positions):,} of {count:,}" if positions else "No rows")
+
+    def open_profile():
+        rows = st.session_state.browse_rows.selection.rows
+        if rows:
+            st.session_state.selected_index = positions[rows[0]]
+            st.session_state.view = "Profile"
+
+    st.dataframe(
+        fetch_page(positions),
+        hide_index=True,
+        width="stretch",
+        on_select=open_profile,
+        selection_mode="single-row",
+        key="browse_rows",
+    )
+
+
+def compare_view(diff, index, filtered, this_label, other_label):
+    """Compare view over a `VersionDiff` of this dataset against another:
+    overlap counts, the physicians whose picked fields changed, and the
+    changed fields of the selected one side by side."""
+    summary = diff.summary()
+    col_both, col_this, col_other = st.columns(3)
+    col_both.metric("NPIs in both", f"{summary['both']:,}")
+    col_this.metric(f"Only in {this_label}", f"{summary['left']:,}")
+    col_other.metric(f"Only in {other_label}", f"{summary['right']:,}")
+
+    labels = {key: label for key, label, _ in diff.fields}
+    picked = st.multiselect(
+        "Changed fields:",
+        list(labels),
+        format_func=lambda key: f"{labels[key]} ({summary[key]:,})",
+        placeholder="Any field",
+        key="compare_fields",
+    )
+    positions = index.positions_of_npis(diff.changed_npis(picked))
+    positions = np.sort(positions[positions >= 0])
+    if filtered is not None:
+        positions = np.intersect1d(positions, filtered, assume_unique=True)
+    st.caption(f"{len(positions):,} physicians differ")
+    _changed_rows(index, positions, lambda p: diff.changed_labels(int(index.npis[p])), "compare_rows")
+
+    current = st.session_state.selected_index
+    st.markdown(f"**{index.labels[current]}**")
+    table = diff.side_by_side(int(index.npis[current]), this_label, other_label)
+    if table is None:
+        st.info(f"Not in {other_label}.")
+    elif table.empty:
+        st.info("No differences.")
+    else:
+        st.dataframe(table, hide_index=True, width="stretch")
+
+
+def cleaning_view(cleaning, index, filtered):
+    """What cleaning changed, from a `CleaningDiff`: profiles per kind of
+    change, the physicians with the picked changes, and the selected one's
+    raw and cleaned values side by side."""
+    if not cleaning.changes:
+        st.info("This version has no raw.* columns to compare.")
+        return
+    summary = cleaning.summary()
+    labels = dict(cleaning.changes)
+    picked = st.multiselect(
+        "Cleaning changed:",
+        [change for change in labels if summary[change]],
+        format_func=lambda change: f"{labels[change]} ({summary[change]:,})",
+        placeholder="Any change",
+        key="cleaning_changes",
+    )
+    positions = cleaning.positions(picked)
+    if filtered is not None:
+        positions = np.intersect1d(positions, filtered, assume_unique=True)
+    st.caption(f"{len(positions):,} physicians changed by cleaning")
+    _changed_rows(index, positions, cleaning.change_labels, "cleaning_rows")
+
+    current = st.session_state.selected_index
+    st.markdown(f"**{index.labels[current]}**")
+    table = cleaning.side_by_side(current)
+    if table.empty:
+        st.info("Cleaning left this profile as it was.")
+    else:
+        st.dataframe(table, hide_index=True, width="stretch")
+
+
+def _changed_rows(index, positions, labels_of, key):
+    """Table of the first COMPARE_ROWS `positions` with what changed for
+    each; picking a row makes it the selected physician."""
+    rows = positions[:COMPARE_ROWS]
+    event = st.dataframe(
+        pd.DataFrame({
+            "Name": [index.labels[p] for p in rows],
+            "NPI": index.npis[rows],
+            "Changed": [", ".join(labels_of(p)) for p in rows],
+        }),
+        hide_index=True,
+        width="stretch",
+        on_select="rerun",
+        selection_mode="single-row",
+        key=key,
+    )
+    if event.selection.rows:
+        st.session_state.selected_index = int(rows[event.selection.rows[0]])
+
+
+def stats_dashboard(stats):
+    """Dashboard over a `DatasetStats`: totals and URL coverage, then a bar
+    chart per aggregate. Everything shown is precomputed."""
+    st.caption("Whole dataset; filters don't apply here.")
+    cols = st.columns(1 + len(stats.coverage))
+    cols[0].metric("Physicians", f"{stats.total:,}")
+    for col, (label, count) in zip(cols[1:], stats.coverage):
+        share = count / stats.total if stats.total else 0
+        col.metric(f"{label} URL coverage", f"{share:.0%}", f"{count:,} profiles", delta_color="off")
+
+    if stats.years:
+        st.markdown("**Years of Experience**")
+        st.bar_chart(
+            pd.DataFrame(stats.years, columns=["Years", "Physicians"]),
+            x="Years",
+            y="Physicians",
+            sort=False,
+        )
+    for key, label, rows in stats.ranked:
+        st.markdown(f"**{label}**")
+        st.bar_chart(
+            pd.DataFrame(rows, columns=[label, "Physicians"]),
+            x=label,
+            y="Physicians",
+            horizontal=True,
+            sort="-Physicians",
+            height=max(160, 24 * len(rows)),
+        )
+
+
+def batch_view(parse, lookup, version, file_stem):
+    """Batch NPI lookup over an uploaded file or a pasted list.
+
+    `parse(data)` turns the upload's bytes into (tokens, npis) and
+    `lookup(tokens, npis)` yields the result table in chunks, which are shown
+    as they arrive. The finished table is kept in the session for this upload
+    and dataset `version`, so reruns don't repeat the lookup.
+    """
+    st.caption("Matched against the whole dataset; filters don't apply here.")
+    upload = st.file_uploader(
+        "NPI list (a CSV with an NPI column, or NPIs one per line):", type=["csv", "txt"], key="batch_upload"
+    )
+    pasted = st.text_area("Or paste NPIs:", key="batch_text")
+    data = upload.getvalue() if upload is not None else pasted.encode()
+    if not data.strip():
+        return
+    digest = (version, hashlib.sha1(data).hexdigest())
+    cached = st.session_state.get("batch_result")
+    if cached is None or cached[0] != digest:
+        tokens, npis = parse(data)
+        bar = st.progress(0.0, text=f"Matching {len(npis):,} NPIs…")
+        table = st.empty()
+        frames = []
+        for frame in lookup(tokens, npis):
+            frames.append(frame)
+            done = sum(len(f) for f in frames)
+            bar.progress(done / len(npis), text=f"Matched {done:,} of {len(npis):,} NPIs…")
+            table.dataframe(pd.concat(frames, ignore_index=True), hide_index=True, width="stretch")
+        bar.empty()
+        table.empty()
+        cached = st.session_state.batch_result = (digest, pd.concat(frames, ignore_index=True) if frames else None)
+    result = cached[1]
+    if result is None:
+        st.info("No NPIs found in the input.")
+        return
+    st.caption(", ".join(f"{status}: {n:,}" for status, n in result["Status"].value_counts(sort=False).items()))
+    st.dataframe(result, hide_index=True, width="stretch")
+    st.download_button(
+        "Download results (CSV)",
+        data=result.to_csv(index=False).encode(),
+        file_name=f"{file_stem}_lookup.csv",
+        mime="text/csv",
+        key="batch_download",
+    )
+
+
+def export_panel(formats, export, total, file_stem, limit=EXPORT_LIMIT):
+    """Sidebar download of the current cohort of `total` profiles.
+
+    `export(fmt)` returns the export's byte-chunk generator. It only runs
+    once Download is clicked, on Streamlit's download thread rather than the
+    script's, so the page stays usable while the export is written. Streamlit
+    serves a download from memory, so cohorts over `limit` are pointed at the
+    API, which streams them.
+    """
+    with st.sidebar.expander(f"Export {total:,} profiles"):
+        if total > limit:
+            st.caption(
+                f"Too many to download here (at most {limit:,}). Narrow the filters, or POST "
+                "the NPIs to the API's /physicians/batch endpoint (`python -m viewer_core.api`), "
+                "which streams the export."
+            )
+            return
+        fmt = st.radio("Format:", list(formats), horizontal=True, key="export_format")
+        st.download_button(
+            "Download",
+            data=lambda: b"".join(export(fmt)),
+            file_name=f"{file_stem}.{fmt}",
+            mime=formats[fmt],
+            on_click="ignore",
+            key="export_download",
+        )
+
+
+def timings_panel(rerun, metrics):
+    """Sidebar debug panel: this rerun's phases and events, then recent
+    p50/p95 per phase across every session in the process."""
+    st.sidebar.markdown("**Timings: this rerun (ms)**")
+    st.sidebar.dataframe(
+        pd.DataFrame(
+            [(phase, round(seconds * 1000, 2)) for phase, seconds in rerun.phases.items()],
+            columns=["phase", "ms"],
+        ),
+        hide_index=True,
+    )
+    if rerun.events:
+        st.sidebar.caption(", ".join(f"{event}: {n}" for event, n in sorted(rerun.events.items())))
+    st.sidebar.markdown("**Timings: recent, all sessions (ms)**")
+    st.sidebar.dataframe(
+        pd.DataFrame(
+            [(phase, n, round(p50, 2), round(p95, 2)) for phase, n, p50, p95 in metrics.summary()],
+            columns=["phase", "count", "p50", "p95"],
+        ),
+        hide_index=True,
+    )